@@ -0,0 +1,139 @@
+"""Exact Mamdani inference for triangular terms, without discretizing the universe.
+
+Clipping triangles at their cut levels and aggregating them with max gives a piecewise linear function. All its
+breakpoints are known in closed form: the triangle corners, where a triangle crosses a cut level and where two edges
+cross. Evaluating the aggregate there is enough to integrate it exactly for the centroid, and to find its maximum and
+the plateaus at that maximum for the mean of maximum. The cost depends on the number of terms only, not on the
+universe resolution.
+"""
+
+from collections.abc import Iterable
+from itertools import combinations
+
+import numpy as np
+
+from onto2robot.membership import MEMBERSHIP_BANK
+from onto2robot.numpy_wrapper import NumpyFuzzyWrapper
+from onto2robot.rules import RuleRecord
+
+DEFUZZIFY_METHODS = ("mom", "centroid")
+
+
+def triangle_memberships(values: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Memberships of ``values`` (any shape) in the triangles ``points`` (terms x 3), terms on the last axis."""
+    x = np.asarray(values, dtype=np.float64)[..., np.newaxis]
+    a, b, c = points[:, 0], points[:, 1], points[:, 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rising = np.where((a < x) & (x < b), (x - a) / (b - a), 0.0)
+        falling = np.where((b < x) & (x < c), (c - x) / (c - b), 0.0)
+    return np.where(x == b, 1.0, rising + falling)
+
+
+def _edges(points: np.ndarray) -> list[tuple[float, float]]:
+    """Slope and intercept of every non-vertical triangle edge."""
+    edges = []
+    for a, b, c in points:
+        if a != b:
+            edges.append((1 / (b - a), -a / (b - a)))
+        if b != c:
+            edges.append((-1 / (c - b), c / (c - b)))
+    return edges
+
+
+def fixed_breakpoints(points: np.ndarray, low: float, high: float) -> np.ndarray:
+    """The breakpoints which do not depend on the cut levels: corners, edge crossings and the universe bounds."""
+    breakpoints = [low, high, *points.ravel()]
+    for (s1, t1), (s2, t2) in combinations(_edges(points), 2):
+        if s1 != s2:
+            breakpoints.append((t2 - t1) / (s1 - s2))
+    return np.unique(np.clip(breakpoints, low, high))
+
+
+def _level_crossings(points: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """Where every triangle rises to and falls from each of ``levels`` (samples x levels)."""
+    a, b, c = points[:, 0], points[:, 1], points[:, 2]
+    level = levels[:, :, np.newaxis]
+    samples = levels.shape[0]
+    return np.concatenate(
+        [(a + level * (b - a)).reshape(samples, -1), (c - level * (c - b)).reshape(samples, -1)], axis=1
+    )
+
+
+def clipped_aggregate(x: np.ndarray, points: np.ndarray, cuts: np.ndarray) -> np.ndarray:
+    """Max of the triangles clipped at ``cuts`` (samples x terms), at ``x`` (samples x points)."""
+    return np.minimum(cuts[:, np.newaxis, :], triangle_memberships(x, points)).max(axis=2)
+
+
+def aggregate_breakpoints(
+    points: np.ndarray, cuts: np.ndarray, low: float, high: float, fixed: np.ndarray | None = None
+):
+    """Sorted breakpoints (samples x points) of the clipped aggregate, which is linear between consecutive ones."""
+    if fixed is None:
+        fixed = fixed_breakpoints(points, low, high)
+    samples = cuts.shape[0]
+    candidates = np.concatenate([np.broadcast_to(fixed, (samples, len(fixed))), _level_crossings(points, cuts)], axis=1)
+    return np.sort(np.clip(candidates, low, high), axis=1)
+
+
+def centroid(points: np.ndarray, cuts: np.ndarray, low: float, high: float, fixed: np.ndarray | None = None):
+    x = aggregate_breakpoints(points, cuts, low, high, fixed)
+    y = clipped_aggregate(x, points, cuts)
+    x0, x1, y0, y1 = x[:, :-1], x[:, 1:], y[:, :-1], y[:, 1:]
+    dx = x1 - x0
+    area = ((y0 + y1) * dx).sum(axis=1) / 2
+    moment = (dx * (x0 * (2 * y0 + y1) + x1 * (y0 + 2 * y1))).sum(axis=1) / 6
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Nothing fired: the aggregate is zero everywhere, and every point of the universe a maximum
+        return np.where(area > 0, moment / area, (low + high) / 2)
+
+
+def mean_of_maximum(points: np.ndarray, cuts: np.ndarray, low: float, high: float, fixed: np.ndarray | None = None):
+    x = aggregate_breakpoints(points, cuts, low, high, fixed)
+    y = clipped_aggregate(x, points, cuts)
+    at_maximum = np.isclose(y, y.max(axis=1, keepdims=True), rtol=0.0, atol=1e-12)
+    # The aggregate is linear between breakpoints, so a segment whose ends are both at the maximum is a plateau
+    plateau = at_maximum[:, :-1] & at_maximum[:, 1:]
+    lengths = np.where(plateau, np.diff(x, axis=1), 0.0)
+    total = lengths.sum(axis=1)
+    midpoints = (x[:, :-1] + x[:, 1:]) / 2
+    isolated = at_maximum.copy()
+    isolated[:, 1:] &= x[:, 1:] != x[:, :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plateau_mean = (lengths * midpoints).sum(axis=1) / total
+        points_mean = np.where(isolated, x, 0.0).sum(axis=1) / isolated.sum(axis=1)
+    return np.where(total > 0, plateau_mean, points_mean)
+
+
+class AnalyticFuzzyWrapper(NumpyFuzzyWrapper):
+    """``NumpyFuzzyWrapper`` with exact fuzzification and defuzzification, using only the universe bounds."""
+
+    def __init__(
+        self,
+        linguistic_variables_spaces: dict[str, list[str]],
+        universe: np.ndarray | tuple[float, float],
+        rules: list[RuleRecord],
+        goals: str | Iterable[str] | None = None,
+        defuzzify_method: str = "mom",
+        **kwargs,
+    ):
+        if defuzzify_method not in DEFUZZIFY_METHODS:
+            raise ValueError(f"Unknown defuzzification method {defuzzify_method}, use one of {DEFUZZIFY_METHODS}")
+        self.defuzzify_method = defuzzify_method
+        self.low, self.high = float(np.min(universe)), float(np.max(universe))
+        bounds = np.array([self.low, self.high])
+        super().__init__(linguistic_variables_spaces, bounds, rules, goals=goals, **kwargs)
+        self.points = {
+            lv_name: MEMBERSHIP_BANK.points(len(terms), self.low, self.high)
+            for lv_name, terms in self.linguistic_variables_spaces.items()
+        }
+        self.fixed_breakpoints = {
+            lv_name: fixed_breakpoints(self.points[lv_name][compiled.used_terms], self.low, self.high)
+            for lv_name, compiled in self.compiled_rules.items()
+        }
+
+    def fuzzify(self, lv_name: str, values: np.ndarray) -> np.ndarray:
+        return triangle_memberships(np.clip(values, self.low, self.high), self.points[lv_name])
+
+    def defuzzify(self, lv_name: str, used_terms: np.ndarray, cuts: np.ndarray) -> np.ndarray:
+        method = centroid if self.defuzzify_method == "centroid" else mean_of_maximum
+        return method(self.points[lv_name][used_terms], cuts, self.low, self.high, self.fixed_breakpoints[lv_name])
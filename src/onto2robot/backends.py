@@ -0,0 +1,101 @@
+"""Registry of fuzzy inference backends, each imported only once it is selected.
+
+A backend is a factory ``(linguistic_variables_spaces, goal, rules) -> engine``, where the engine offers
+``set_start_values``, ``compute(layer)`` and ``goals_inferred`` like the bundled wrappers. Other packages add engines
+through the ``onto2robot.backends`` entry point group, e.g. in their ``pyproject.toml``::
+
+    [project.entry-points."onto2robot.backends"]
+    my-engine = "my_package.engine:make_engine"
+"""
+
+from collections.abc import Callable
+
+ENTRY_POINT_GROUP = "onto2robot.backends"
+
+UNIVERSE_MIN = 0.0
+UNIVERSE_MAX = 40.0
+
+BackendFactory = Callable[[dict[str, list[str]], str, list], object]
+
+
+def make_scikit_fuzzy(linguistic_variables_spaces: dict[str, list[str]], goal: str, rules: list):
+    import numpy as np
+
+    from onto2robot.scikit_fuzz_wrapper import ScikitFuzzyWrapper
+
+    universe = np.arange(UNIVERSE_MIN, UNIVERSE_MAX, 1)
+    return ScikitFuzzyWrapper(linguistic_variables_spaces, goal, universe=universe, rules=rules, goals=[goal])
+
+
+def make_simpful(linguistic_variables_spaces: dict[str, list[str]], goal: str, rules: list):
+    from onto2robot.fs_wrapper import SimpfulFuzzyWrapper
+
+    universe = (UNIVERSE_MIN, UNIVERSE_MAX)
+    return SimpfulFuzzyWrapper(linguistic_variables_spaces, universe=universe, rules=rules, goals=[goal])
+
+
+def make_numpy(linguistic_variables_spaces: dict[str, list[str]], goal: str, rules: list):
+    import numpy as np
+
+    from onto2robot.numpy_wrapper import NumpyFuzzyWrapper
+
+    universe = np.arange(UNIVERSE_MIN, UNIVERSE_MAX, 1)
+    return NumpyFuzzyWrapper(linguistic_variables_spaces, universe=universe, rules=rules, goals=[goal])
+
+
+def make_analytic(linguistic_variables_spaces: dict[str, list[str]], goal: str, rules: list):
+    import numpy as np
+
+    from onto2robot.analytic import AnalyticFuzzyWrapper
+
+    # The grid of the numpy and scikit-fuzzy backends, whose bounds set the same triangles; only the sampling differs
+    universe = np.arange(UNIVERSE_MIN, UNIVERSE_MAX, 1)
+    return AnalyticFuzzyWrapper(linguistic_variables_spaces, universe=universe, rules=rules, goals=[goal])
+
+
+BUILTIN_BACKENDS = {
+    "scikit-fuzzy": make_scikit_fuzzy,
+    "simpful": make_simpful,
+    "numpy": make_numpy,
+    "analytic": make_analytic,
+}
+_registered: dict[str, BackendFactory] = {}
+
+
+def register_backend(name: str, factory: BackendFactory) -> None:
+    _registered[name] = factory
+
+
+def _entry_points() -> dict:
+    # importlib.metadata scans every installed distribution, so it is only consulted for names not known otherwise
+    from importlib.metadata import entry_points
+
+    return {entry_point.name: entry_point for entry_point in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def available_backends() -> list[str]:
+    return list(dict.fromkeys([*BUILTIN_BACKENDS, *_registered, *_entry_points()]))
+
+
+def get_backend(name: str) -> BackendFactory:
+    if name in _registered:
+        return _registered[name]
+    if name in BUILTIN_BACKENDS:
+        return BUILTIN_BACKENDS[name]
+    entry_points = _entry_points()
+    if name not in entry_points:
+        raise ValueError(f"Unknown fuzzy model: {name}. Available: {', '.join(available_backends())}")
+    factory = entry_points[name].load()
+    _registered[name] = factory
+    return factory
+
+
+def build_engine(
+    fuzzy_model: str, linguistic_variables_spaces: dict[str, list[str]], goal: str, rules: list, tracer=None
+):
+    if tracer is None:
+        return get_backend(fuzzy_model)(linguistic_variables_spaces, goal, rules)
+    with tracer.span("stage", "construct"):
+        engine = get_backend(fuzzy_model)(linguistic_variables_spaces, goal, rules)
+    engine.tracer = tracer
+    return engine
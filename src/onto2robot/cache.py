@@ -0,0 +1,111 @@
+"""On-disk cache of compiled rule bases, keyed by the ontology file content and the package version."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from onto2robot.rules import RuleBase, RuleRecord
+
+CACHE_FORMAT = 1
+
+
+def package_version() -> str:
+    # importlib.metadata is slow to import, and only needed once the cache is consulted
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("onto2robot")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def default_cache_dir() -> Path:
+    if "ONTO2ROBOT_CACHE_DIR" in os.environ:
+        return Path(os.environ["ONTO2ROBOT_CACHE_DIR"])
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "onto2robot"
+
+
+def ontology_digest(ontology_path: str | Path) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{package_version()}:{CACHE_FORMAT}:".encode())
+    with open(ontology_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_file(ontology_path: str | Path, cache_dir: str | Path | None = None) -> Path:
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    return cache_dir / f"{Path(ontology_path).stem}-{ontology_digest(ontology_path)}.json"
+
+
+def rule_base_to_dict(rule_base: RuleBase) -> dict:
+    return {
+        "format": CACHE_FORMAT,
+        "version": package_version(),
+        "rules": [
+            [rule.name, [list(premise) for premise in rule.premises], list(rule.conclusion)] for rule in rule_base.rules
+        ],
+        "linguistic_values": {variable: sorted(terms) for variable, terms in rule_base.linguistic_values.items()},
+        "chains": [
+            {"goals": list(goals), "layers": [sorted(layer) for layer in layers], "sources": sorted(sources)}
+            for goals, (layers, sources) in rule_base.chains.items()
+        ],
+    }
+
+
+def rule_base_from_dict(data: dict) -> RuleBase:
+    rules = [
+        RuleRecord(name, tuple(tuple(premise) for premise in premises), tuple(conclusion))
+        for name, premises, conclusion in data["rules"]
+    ]
+    linguistic_values = {variable: set(terms) for variable, terms in data["linguistic_values"].items()}
+    chains = {
+        tuple(chain["goals"]): ([set(layer) for layer in chain["layers"]], set(chain["sources"]))
+        for chain in data["chains"]
+    }
+    return RuleBase(rules, linguistic_values, chains)
+
+
+def load_cached_rule_base(path: Path) -> RuleBase | None:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != CACHE_FORMAT or data.get("version") != package_version():
+        return None
+    return rule_base_from_dict(data)
+
+
+def save_cached_rule_base(rule_base: RuleBase, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write next to the target and rename, so concurrent readers never see a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(rule_base_to_dict(rule_base), f)
+    os.replace(tmp_path, path)
+
+
+def compile_rule_base(
+    ontology_path: str | Path,
+    goals: list[str] | None = None,
+    cache_dir: str | Path | None = None,
+    use_cache: bool = True,
+) -> RuleBase:
+    path = cache_file(ontology_path, cache_dir) if use_cache else None
+    rule_base = load_cached_rule_base(path) if use_cache else None
+    if rule_base is None:
+        # Only parse the ontology when there is no valid cache, so owlready2 is not even imported on a hit
+        from onto2robot.core import MobileOntologyMeta
+
+        rule_base = MobileOntologyMeta(str(Path(ontology_path).resolve())).rule_base
+    elif goals is None or tuple(sorted(set(goals))) in rule_base.chains:
+        return rule_base
+
+    if goals is not None:
+        rule_base.get_possible_chains(goals)
+    if use_cache:
+        save_cached_rule_base(rule_base, path)
+    return rule_base
@@ -1,17 +1,25 @@
 """Command line interface for onto2robot."""
 
 import argparse
+import contextlib
+import functools
 import json
+import sys
+from collections.abc import Iterable
 from pathlib import Path
+from typing import TextIO
 
-import numpy as np
+from onto2robot.backends import BUILTIN_BACKENDS, build_engine, get_backend
+from onto2robot.cache import compile_rule_base
+from onto2robot.inference import IncrementalInference, run_layers
+from onto2robot.memo import MemoizedEngine
+from onto2robot.tracing import NULL_TRACER, NullTracer, PrintTracer, ProfilingTracer
 
-from onto2robot.core import MobileOntologyMeta
-from onto2robot.fs_wrapper import SimpfulFuzzyWrapper
-from onto2robot.scikit_fuzz_wrapper import ScikitFuzzyWrapper
-
-UNIVERSE_MIN = 0.0
-UNIVERSE_MAX = 40.0
+# TODO: replace with proper extraction from ontology
+LINGUISTIC_SPACES = [
+    ["low", "middle", "high"],
+    ["left", "forward", "right"],
+]
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -19,53 +27,147 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--input", type=str, help="Ontology to parse", required=True)
     parser.add_argument("--goal", type=str, help="Goal individual name", required=True)
     parser.add_argument(
-        "--fuzzy_model", type=str, choices=["scikit-fuzzy", "simpful"], help="Fuzzy logic library to use", required=True
+        "--fuzzy_model",
+        type=str,
+        # Not argparse choices: listing plugin backends would scan every installed distribution on each start
+        help=f"Fuzzy logic library to use: {', '.join(BUILTIN_BACKENDS)} or a registered backend",
+        required=True,
+    )
+    parser.add_argument("--input_values", type=str, help="Input values as JSON string")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read one JSON object of input values per line from stdin and write one JSON result line per input",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="In stream mode, keep readings between lines and recompute only what depends on the changed ones",
+    )
+    parser.add_argument("--cache_dir", type=str, help="Directory for the compiled rule base cache", default=None)
+    parser.add_argument("--no_cache", action="store_true", help="Always parse the ontology, bypassing the cache")
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Print each layer and inferred value as it happens, and stage timings and firing strengths on stderr",
+    )
+    parser.add_argument("--profile", type=str, help="Write cProfile statistics of the inference layers to this file")
+    parser.add_argument(
+        "--profile_every",
+        type=int,
+        default=1,
+        help="With --profile, profile only one of this many layer computations, to bound the cost on long streams",
+    )
+    parser.add_argument(
+        "--memo_step",
+        type=float,
+        default=None,
+        help="Cache results for inputs quantized to this step, inputs are then rounded to it",
+    )
+    parser.add_argument("--memo_size", type=int, default=4096, help="Most cached results, least recently used go first")
+    parser.add_argument(
+        "--rule_stats",
+        action="store_true",
+        help="Print the rules evaluated and fired per inference on stderr (numpy and analytic backends)",
     )
-    parser.add_argument("--input_values", type=str, help="Input values as JSON string", required=True)
 
     return parser
 
 
+def stream(fs, reasoning_order: list[set], lines: Iterable[str], out: TextIO, incremental: bool = False) -> None:
+    if incremental:
+        infer = IncrementalInference(fs, reasoning_order).infer
+    else:
+        infer = functools.partial(run_layers, fs, reasoning_order=reasoning_order)
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            input_values = json.loads(line)
+            if not isinstance(input_values, dict):
+                raise ValueError("Expected a JSON object of input values")
+            result = infer(input_values)
+        except Exception as e:
+            # A malformed reading must not stop the pipeline. Backends fail in their own ways on incomplete readings,
+            # simpful e.g. raises a bare Exception for a variable that was never set
+            result = {"error": str(e)}
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+
 def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        from onto2robot.server import main as serve
+
+        return serve(argv[1:])
+    if argv[:1] == ["generate"]:
+        from onto2robot.codegen import main as generate
+
+        return generate(argv[1:])
+    if argv[:1] == ["synthesize"]:
+        from onto2robot.synthetic import main as synthesize
+
+        return synthesize(argv[1:])
+
     parser = build_parser()
     args = parser.parse_args(argv)
-    print(f"Selected ontology: {args.input}")
-    if Path(args.input).is_file():
-        ont = MobileOntologyMeta("mobile_robot_ontology")
-        rules = ont.get_rules()
+    if args.input_values is None and not args.stream:
+        parser.error("--input_values is required unless --stream is given")
+    if args.profile_every < 1:
+        parser.error("--profile_every must be at least 1")
+    try:
+        get_backend(args.fuzzy_model)
+    except ValueError as e:
+        parser.error(str(e))
+
+    out = sys.stdout
+    # In stream mode stdout carries only the JSON results, everything else is diagnostics
+    with contextlib.redirect_stdout(sys.stderr) if args.stream else contextlib.nullcontext():
+        print(f"Selected ontology: {args.input}")
+        if not Path(args.input).is_file():
+            print(f"Failed to process with ontology from path {args.input}")
+            return 1
         goal = args.goal
-        # TODO: replace with proper extraction from ontology
-        linguistic_spaces = [
-            ["low", "middle", "high"],
-            ["left", "forward", "right"],
-        ]
-        linguistic_variables_spaces = ont.linguistic_value_spaces(linguistic_spaces)
-        reasoning_order, source_variables = ont.get_possible_chains([ont.get_individual_by_name(goal)])
-
-        if args.fuzzy_model == "scikit-fuzzy":
-            universe = np.arange(UNIVERSE_MIN, UNIVERSE_MAX, 1)
-            fs = ScikitFuzzyWrapper(
-                linguistic_variables_spaces,
-                args.goal,
-                universe=universe,
-                rules=rules,
-            )
-        elif args.fuzzy_model == "simpful":
-            universe = (UNIVERSE_MIN, UNIVERSE_MAX)
-            fs = SimpfulFuzzyWrapper(
-                linguistic_variables_spaces,
-                universe=universe,
-                rules=rules,
-            )
-        input_values = json.loads(args.input_values)
-
-        fs.set_start_values(input_values)
+        tracer = make_tracer(args)
+        with tracer.span("stage", "compile_rule_base"):
+            rule_base = compile_rule_base(args.input, [goal], cache_dir=args.cache_dir, use_cache=not args.no_cache)
+        rules = rule_base.rules
+        with tracer.span("stage", "linguistic_value_spaces"):
+            linguistic_variables_spaces = rule_base.linguistic_value_spaces(LINGUISTIC_SPACES)
+        with tracer.span("stage", "get_possible_chains"):
+            reasoning_order, source_variables = rule_base.get_possible_chains([goal])
+
+        fs = build_engine(args.fuzzy_model, linguistic_variables_spaces, goal, rules, tracer=tracer)
+        if args.memo_step is not None:
+            fs = MemoizedEngine(fs, args.memo_step, args.memo_size)
         print(reasoning_order)
-        for layer in reversed(reasoning_order):
-            fs.compute(layer)
+        if args.stream:
+            stream(fs, reasoning_order, sys.stdin, out, incremental=args.incremental)
+        else:
+            for var_name, value in run_layers(fs, json.loads(args.input_values), reasoning_order).items():
+                print(f" Inferred {var_name} = {value}")
+        if tracer.enabled:
+            print(json.dumps(tracer.summary()), file=sys.stderr)
+        if args.memo_step is not None:
+            print(json.dumps({"memo": fs.stats()}), file=sys.stderr)
+        if args.rule_stats:
+            if hasattr(fs, "activation_stats"):
+                print(json.dumps({"rule_activation": fs.activation_stats()}), file=sys.stderr)
+            else:
+                print(f"{args.fuzzy_model} does not report rule activation", file=sys.stderr)
+        if args.profile:
+            tracer.dump(args.profile)
         return 0
-    print(f"Failed to process with ontology from path {args.input}")
-    return 1
+
+
+def make_tracer(args: argparse.Namespace) -> NullTracer:
+    if args.profile:
+        return ProfilingTracer(sample_every=args.profile_every)
+    if args.trace:
+        # stdout may be the JSON results stream, so the trace always goes to stderr
+        return PrintTracer(sys.stderr)
+    return NULL_TRACER
 
 
 if __name__ == "__main__":
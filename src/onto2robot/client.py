@@ -0,0 +1,65 @@
+"""Client for ``onto2robot serve``, over localhost HTTP (``http://127.0.0.1:8765``) or Unix sockets (``unix:/path``)."""
+
+import json
+import socket
+import urllib.error
+import urllib.request
+
+
+class InferenceError(RuntimeError):
+    pass
+
+
+class InferenceClient:
+    def __init__(self, address: str, ontology: str, goal: str, backend: str = "numpy", timeout: float = 30.0):
+        self.address = address
+        self.request = {"ontology": ontology, "goal": goal, "backend": backend}
+        self.timeout = timeout
+        self._socket = None
+        self._reader = None
+
+    def infer(self, input_values: dict[str, float]) -> dict[str, float]:
+        return self._send({**self.request, "inputs": input_values})
+
+    def infer_batch(self, inputs: list[dict[str, float]]) -> list[dict[str, float]]:
+        return self._send({**self.request, "inputs": list(inputs)})
+
+    def close(self):
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _send(self, request: dict):
+        response = self._send_unix(request) if self.address.startswith("unix:") else self._send_http(request)
+        if "error" in response:
+            raise InferenceError(response["error"])
+        return response["outputs"]
+
+    def _send_unix(self, request: dict) -> dict:
+        # One connection is kept open, the server answers each line in order
+        if self._socket is None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            self._socket.connect(self.address.removeprefix("unix:"))
+            self._reader = self._socket.makefile("rb")
+        self._socket.sendall(json.dumps(request).encode() + b"\n")
+        return json.loads(self._reader.readline())
+
+    def _send_http(self, request: dict) -> dict:
+        http_request = urllib.request.Request(
+            self.address.rstrip("/") + "/infer",
+            data=json.dumps(request).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(http_request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return json.loads(e.read())
@@ -0,0 +1,177 @@
+"""Generate standalone controller modules, which run a goal's inference with NumPy only.
+
+The generated module embeds the membership functions, the compiled rule tables and the reasoning order, and reuses
+the membership and defuzzification code of ``NumpyFuzzyWrapper``, so both give identical results.
+"""
+
+import argparse
+import inspect
+import json
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from onto2robot.membership import automf_points, triangular_membership
+from onto2robot.numpy_wrapper import NumpyFuzzyWrapper, mean_of_maximum
+from onto2robot.rules import RuleRecord, as_rule_records, goal_names, rule_record_to_string
+
+RUNTIME = """
+MEMBERSHIPS = {
+    lv_name: np.array([triangular_membership(UNIVERSE, *abc) for abc in points])
+    for lv_name, points in MEMBERSHIP_POINTS.items()
+}
+_RULES = {
+    lv_name: {
+        "premise_variables": table["premise_variables"],
+        "premise_index": np.array(table["premise_index"], dtype=np.intp),
+        "conclusion_terms": np.array(table["conclusion_terms"], dtype=np.intp),
+        "used_terms": np.array(table["used_terms"], dtype=np.intp),
+    }
+    for lv_name, table in RULES.items()
+}
+
+
+def fuzzify(lv_name, values):
+    values = np.clip(values, UNIVERSE[0], UNIVERSE[-1])
+    return np.stack(
+        [np.interp(values, UNIVERSE, membership, left=0.0, right=0.0) for membership in MEMBERSHIPS[lv_name]], axis=-1
+    )
+
+
+def infer_variable(lv_name, values):
+    table = _RULES[lv_name]
+    samples = max((len(value) for value in values.values()), default=1)
+    premise_memberships = np.concatenate(
+        [
+            fuzzify(variable, np.broadcast_to(values.get(variable, DEFAULT_VALUE), samples))
+            for variable in table["premise_variables"]
+        ]
+        + [np.ones((samples, 1))],
+        axis=1,
+    )
+    firing = np.fmin.reduce(premise_memberships[:, table["premise_index"]], axis=2)
+    cuts = np.stack(
+        [np.fmax.reduce(firing[:, table["conclusion_terms"] == term], axis=1) for term in table["used_terms"]], axis=1
+    )
+    return mean_of_maximum(UNIVERSE, MEMBERSHIPS[lv_name][table["used_terms"]], cuts)
+
+
+def infer_batch(inputs):
+    values = {var_name: np.atleast_1d(np.asarray(value, dtype=np.float64)) for var_name, value in inputs.items()}
+    outputs = {}
+    for layer in REASONING_ORDER:
+        layer_outputs = {var_name: infer_variable(var_name, values) for var_name in layer}
+        values.update(layer_outputs)
+        outputs.update(layer_outputs)
+    return outputs
+
+
+def infer(input_values):
+    return {var_name: float(value[0]) for var_name, value in infer_batch(input_values).items()}
+"""
+
+
+def _literal(value) -> str:
+    if isinstance(value, np.ndarray):
+        return _literal(value.tolist())
+    if isinstance(value, float | np.floating):
+        return repr(float(value))
+    if isinstance(value, int | np.integer):
+        return repr(int(value))
+    if isinstance(value, tuple):
+        return "(" + ", ".join(_literal(item) for item in value) + ("," if len(value) == 1 else "") + ")"
+    if isinstance(value, list):
+        return "[" + ", ".join(_literal(item) for item in value) + "]"
+    if isinstance(value, str):
+        return json.dumps(value)
+    return repr(value)
+
+
+def _dict_literal(mapping: dict, indent: str = "") -> str:
+    """A multi-line dict display, whose values are already literals."""
+    lines = [f"{indent}    {json.dumps(key)}: {value}," for key, value in mapping.items()]
+    return "{\n" + "\n".join(lines) + f"\n{indent}}}"
+
+
+def _universe_literal(universe: np.ndarray) -> str:
+    evenly_spaced = np.linspace(universe[0], universe[-1], len(universe))
+    if np.array_equal(evenly_spaced, universe):
+        return f"np.linspace({_literal(universe[0])}, {_literal(universe[-1])}, {len(universe)})"
+    return f"np.array({_literal(universe)})"
+
+
+def generate_controller(
+    linguistic_variables_spaces: dict[str, list[str]],
+    universe: np.ndarray,
+    rules: list[RuleRecord],
+    goals: str | Iterable[str],
+    source: str = "an ontology",
+) -> str:
+    fs = NumpyFuzzyWrapper(linguistic_variables_spaces, universe, as_rule_records(rules), goals=goals)
+    evaluation_order = [sorted(layer) for layer in reversed(fs.reasoning_order)]
+    membership_points = {
+        lv_name: _literal([tuple(float(point) for point in abc) for abc in automf_points(len(terms), fs.universe)])
+        for lv_name, terms in fs.linguistic_variables_spaces.items()
+    }
+    rule_tables = {}
+    for lv_name in (var_name for layer in evaluation_order for var_name in layer):
+        compiled = fs.compiled_rules[lv_name]
+        premise_rows = "".join(f"            {_literal(row)},\n" for row in compiled.premise_index)
+        table = {
+            "premise_variables": _literal(compiled.premise_variables),
+            "premise_index": f"[\n{premise_rows}        ]",
+            "conclusion_terms": _literal(compiled.conclusion_terms),
+            "used_terms": _literal(compiled.used_terms),
+        }
+        rule_tables[lv_name] = _dict_literal(table, indent="    ")
+    terms = {lv_name: _literal(list(terms)) for lv_name, terms in fs.linguistic_variables_spaces.items()}
+
+    parts = [
+        f'"""Fuzzy controller for {", ".join(goal_names(goals))}, generated by onto2robot from {source}.\n\n'
+        'Do not edit, regenerate it from the ontology instead.\n"""\n',
+        "import numpy as np\n",
+        "# Rules, in the order of the rows of their conclusion variable's premise index table:",
+        *(f"#   {rule.name}: {rule_record_to_string(rule)}" for rule in fs.rules),
+        "",
+        f"UNIVERSE = {_universe_literal(fs.universe)}",
+        f"DEFAULT_VALUE = {_literal(fs.default_value())}",
+        f"TERMS = {_dict_literal(terms)}",
+        f"SOURCE_VARIABLES = {_literal(sorted(fs.source_variables))}",
+        f"REASONING_ORDER = {_literal(evaluation_order)}",
+        f"MEMBERSHIP_POINTS = {_dict_literal(membership_points)}",
+        "# Premise term columns per rule, padded with the last column, which always holds ones",
+        f"RULES = {_dict_literal(rule_tables)}",
+        "",
+        "",
+        inspect.getsource(triangular_membership),
+        "",
+        inspect.getsource(mean_of_maximum),
+        RUNTIME,
+    ]
+    return "\n".join(parts)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from onto2robot.backends import UNIVERSE_MAX, UNIVERSE_MIN
+    from onto2robot.cache import compile_rule_base
+    from onto2robot.cli import LINGUISTIC_SPACES
+
+    parser = argparse.ArgumentParser(prog="onto2robot generate", description=__doc__.splitlines()[0])
+    parser.add_argument("--input", type=str, help="Ontology to parse", required=True)
+    parser.add_argument("--goal", type=str, help="Goal individual name", required=True)
+    parser.add_argument("--output", type=str, help="Python module to write", required=True)
+    parser.add_argument("--cache_dir", type=str, help="Directory for the compiled rule base cache", default=None)
+    args = parser.parse_args(argv)
+
+    rule_base = compile_rule_base(args.input, [args.goal], cache_dir=args.cache_dir)
+    source = generate_controller(
+        rule_base.linguistic_value_spaces(LINGUISTIC_SPACES),
+        np.arange(UNIVERSE_MIN, UNIVERSE_MAX, 1),
+        rule_base.rules,
+        [args.goal],
+        source=Path(args.input).name,
+    )
+    Path(args.output).write_text(source)
+    print(f"Wrote controller for {args.goal} to {args.output}")
+    return 0
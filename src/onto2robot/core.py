@@ -1,6 +1,19 @@
+import weakref
+from collections.abc import Iterable
 from pathlib import Path
 
-from owlready2 import EntityClass, Ontology, Thing, ThingClass, get_ontology, onto_path
+import networkx as nx
+from owlready2 import EntityClass, Ontology, Thing, ThingClass, World, onto_path
+from owlready2.base import owl_named_individual, rdf_type, rdfs_subclassof
+
+from onto2robot.rules import (
+    RuleBase,
+    RuleRecord,
+    reachable_variables,
+    rule_record_to_string,
+    source_variables,
+    variable_name,
+)
 
 OntologyIndividualSuperclass = Thing
 OntologyClassSuperclass = EntityClass
@@ -21,30 +34,13 @@ def _get_left_right_hands(
     return left_hand[0], right_hand[0]
 
 
-def rule_to_string(rule: OntologyIndividualSuperclass) -> str:
-    premises = _get_premises(rule)
-    conclusions = _get_conclusions(rule)
-    return _build_rule_from_premises(premises, conclusions)
-
-
-def rule_to_pair(rule: OntologyIndividualSuperclass) -> tuple[str, str]:
-    premises = _get_premises(rule)
-    conclusions = _get_conclusions(rule)
-    return rule.name, _build_rule_from_premises(premises, conclusions)
-
+def rule_to_string(rule: OntologyIndividualSuperclass | RuleRecord) -> str:
+    return rule_record_to_string(extract_rule(rule))
 
-def _build_rule_from_premises(
-    premises: list[OntologyIndividualSuperclass], conclusions: list[OntologyIndividualSuperclass]
-) -> str:
-    premise_parts = []
-    for premise in premises:
-        left, right = _get_left_right_hands(premise)
-        premise_parts.append(f"({left.name} IS {right.name})")
-    premise_str = " AND ".join(premise_parts)
 
-    conclusion = conclusions[0]
-    left, right = _get_left_right_hands(conclusion)
-    return f"IF {premise_str} THEN ({left.name} IS {right.name});"
+def rule_to_pair(rule: OntologyIndividualSuperclass | RuleRecord) -> tuple[str, str]:
+    record = extract_rule(rule)
+    return record.name, rule_record_to_string(record)
 
 
 def _get_premises(rule: OntologyIndividualSuperclass) -> list[OntologyIndividualSuperclass]:
@@ -55,112 +51,278 @@ def _get_conclusions(rule: OntologyIndividualSuperclass) -> list[OntologyIndivid
     return _get_property_values(rule, "hasConclusion")
 
 
-def load_ontology(ontology_name: str) -> Ontology:
+def _property_values_by_name(entity: OntologyIndividualSuperclass) -> dict[str, list[OntologyIndividualSuperclass]]:
+    return {prop.name: prop[entity] for prop in entity.get_properties()}
+
+
+def _hand_names(
+    entity: OntologyIndividualSuperclass, cache: dict[OntologyIndividualSuperclass, tuple[str, str]]
+) -> tuple[str, str]:
+    if entity not in cache:
+        values = _property_values_by_name(entity)
+        cache[entity] = values["hasLeftHand"][0].name, values["hasRightHand"][0].name
+    return cache[entity]
+
+
+def extract_rule(
+    rule: OntologyIndividualSuperclass | RuleRecord,
+    hands_cache: dict[OntologyIndividualSuperclass, tuple[str, str]] | None = None,
+) -> RuleRecord:
+    if isinstance(rule, RuleRecord):
+        return rule
+    if hands_cache is None:
+        hands_cache = {}
+    values = _property_values_by_name(rule)
+    conclusions = values.get("hasConclusion", [])
+    if not conclusions:
+        raise ValueError(f"Rule {rule.name} has no conclusion")
+    premises = tuple(_hand_names(premise, hands_cache) for premise in values.get("hasPremise", []))
+    return RuleRecord(rule.name, premises, _hand_names(conclusions[0], hands_cache))
+
+
+def extract_rules(rules: Iterable[OntologyIndividualSuperclass | RuleRecord]) -> list[RuleRecord]:
+    # Premises and conclusions are often shared between rules, so their hands are resolved only once
+    hands_cache = {}
+    return [extract_rule(rule, hands_cache) for rule in rules]
+
+
+def _stored_ontology(world: World, uri: str) -> Ontology | None:
+    # owlready2 renames a loaded ontology to the IRI declared in the file and keeps the file URI as an alias
+    row = world.graph.execute(
+        "SELECT ontology_alias.iri FROM ontology_alias, ontologies "
+        "WHERE ontology_alias.alias=? AND ontologies.iri=ontology_alias.iri",
+        (f"{uri}#",),
+    ).fetchone()
+    return world.get_ontology(row[0]) if row else None
+
+
+def load_ontology(ontology_name: str, quadstore: str | Path | None = None) -> Ontology:
     project_root = Path(__file__).resolve().parents[2]
     onto_path.append(project_root / "ontologies")
     path_to_file = (project_root / "ontologies" / Path(ontology_name)).with_suffix(".owl")
-    return get_ontology(path_to_file.resolve().as_uri()).load()
+    uri = path_to_file.resolve().as_uri()
+    if quadstore is None:
+        # A private world per load keeps ontologies sharing an IRI (tests.owl and mobile_robot_ontology.owl) apart
+        return World().get_ontology(uri).load()
+
+    # For the same reason use one quadstore file per ontology file
+    world = World(filename=str(quadstore), exclusive=False)
+    ontology = _stored_ontology(world, uri)
+    if ontology is not None:
+        if ontology.graph.get_last_update_time() >= path_to_file.stat().st_mtime:
+            # Already parsed: entities are read lazily from SQLite on access
+            return ontology
+        ontology.destroy()
+    ontology = world.get_ontology(uri).load()
+    world.save()
+    return ontology
+
+
+class IndividualEvents:
+    """Reports the changes to an ontology which affect an index of its individuals, other writes like property
+    assignments are not reported.
+
+    Individuals created, reclassified or renamed are passed to ``refresh_individual`` of every registered index, so it
+    can update them in place. Types removed, classes moved in the hierarchy and entities destroyed instead bump
+    ``generation``, those are rare enough to rebuild the index for. The quadstore methods owlready2 copies onto the
+    world and the ontology are wrapped to notice the changes, as its own ``owlready2.observe`` does.
+    """
+
+    def __init__(self, ontology: Ontology):
+        self.generation = 0
+        self.indexes = weakref.WeakSet()
+        world = ontology.world
+        ontology._add_obj_triple_raw_spo = self._on_add(ontology._add_obj_triple_raw_spo)
+        ontology._set_obj_triple_raw_spo = self._on_add(ontology._set_obj_triple_raw_spo)
+        for namespace in (world, ontology):
+            namespace._del_obj_triple_raw_spo = self._on_delete(namespace._del_obj_triple_raw_spo)
+            namespace._refactor = self._on_rename(namespace._refactor)
+        world.graph.destroy_entity = self._on_destroy(world.graph.destroy_entity)
+
+    def _changed(self, storid: int) -> None:
+        for index in self.indexes:
+            index.refresh_individual(storid)
+
+    def _on_add(self, method):
+        def wrapper(s, p, o):
+            method(s, p, o)
+            if p == rdf_type:
+                self._changed(s)
+            elif p == rdfs_subclassof:
+                self.generation += 1
+
+        return wrapper
+
+    def _on_delete(self, method):
+        def wrapper(s=None, p=None, o=None):
+            method(s, p, o)
+            # Deleting without a predicate deletes the types too
+            if p in (None, rdf_type, rdfs_subclassof):
+                self.generation += 1
+
+        return wrapper
+
+    def _on_rename(self, method):
+        def wrapper(storid, new_iri):
+            method(storid, new_iri)
+            self._changed(storid)
+
+        return wrapper
+
+    def _on_destroy(self, method):
+        def wrapper(*args, **kwargs):
+            self.generation += 1
+            return method(*args, **kwargs)
+
+        return wrapper
+
+
+def individual_events(ontology: Ontology) -> IndividualEvents:
+    events = getattr(ontology, "_individual_events", None)
+    if events is None:
+        events = ontology._individual_events = IndividualEvents(ontology)
+    return events
+
+
+def is_persistent(ontology: Ontology) -> bool:
+    return ontology.world.filename not in (None, ":memory:")
 
 
 class MobileOntologyMeta:
-    def __init__(self, ontology: Ontology | str) -> None:
+    def __init__(self, ontology: Ontology | str, quadstore: str | Path | None = None) -> None:
         if isinstance(ontology, str):
-            ontology = load_ontology(ontology).load()
+            ontology = load_ontology(ontology, quadstore)
         self.ontology = ontology
+        self._rule_base = None
+        self._individuals_by_name = None
+        self._instances_by_class = None
+        self._indexed_generation = None
+        self._pending = set()
 
     def __del__(self):
-        self.ontology.destroy()
+        self.destroy()
 
     def get_rules(self) -> list[OntologyIndividualSuperclass]:
         rules_class: ThingClass = self.ontology.RuleHeader
         return list(rules_class.instances())
 
     def destroy(self) -> None:
-        self.ontology.destroy()
+        if is_persistent(self.ontology):
+            # Destroying would delete the parsed ontology from the quadstore, closing keeps it for the next run
+            self.ontology.world.close()
+        else:
+            self.ontology.destroy()
 
     def rules_as_strings(self) -> list[str]:
-        return [rule_to_string(rule) for rule in self.get_rules()]
+        return [rule_record_to_string(rule) for rule in self.get_rule_records()]
 
-    def get_individual_by_name(self, name: str) -> OntologyIndividualSuperclass | None:
+    def invalidate_indexes(self) -> None:
+        self._individuals_by_name = None
+        self._instances_by_class = None
+        self._indexed_generation = None
+
+    def _ensure_indexes(self) -> None:
+        events = individual_events(self.ontology)
+        if self._individuals_by_name is not None and self._indexed_generation == events.generation:
+            self._refresh_pending()
+            return
+        self._individuals_by_name = {}
+        self._instances_by_class = {}
+        self._indexed = {}
+        self._ancestors = {}
+        self._pending = set()
         for individual in self.ontology.individuals():
-            if individual.name == name:
-                return individual
-        return None
+            self._index_individual(individual)
+        self._indexed_generation = events.generation
+        events.indexes.add(self)
+
+    def refresh_individual(self, storid: int) -> None:
+        """Called by ``IndividualEvents`` for an individual created, reclassified or renamed, indexed on next lookup."""
+        if self._individuals_by_name is not None:
+            self._pending.add(storid)
+
+    def _refresh_pending(self) -> None:
+        while self._pending:
+            storid = self._pending.pop()
+            individual = self.ontology.world._get_by_storid(storid)
+            # Only named individuals of this ontology, as listed by ontology.individuals()
+            if isinstance(individual, Thing) and self.ontology._has_obj_triple_spo(
+                storid, rdf_type, owl_named_individual
+            ):
+                self._index_individual(individual)
+
+    def _index_individual(self, individual: OntologyIndividualSuperclass) -> None:
+        name, classes = self._indexed.get(individual, (None, set()))
+        if name != individual.name:
+            if name is not None and self._individuals_by_name.get(name) is individual:
+                del self._individuals_by_name[name]
+            self._individuals_by_name.setdefault(individual.name, individual)
+        new_classes = set()
+        for cls in individual.is_a:
+            if not isinstance(cls, ThingClass):
+                continue
+            if cls not in self._ancestors:
+                self._ancestors[cls] = cls.ancestors()
+            new_classes |= self._ancestors[cls]
+        for ancestor in new_classes - classes:
+            self._instances_by_class.setdefault(ancestor, []).append(individual)
+        self._indexed[individual] = (individual.name, classes | new_classes)
+
+    def get_individual_by_name(self, name: str) -> OntologyIndividualSuperclass | None:
+        self._ensure_indexes()
+        return self._individuals_by_name.get(name)
+
+    def get_instances_of(self, cls: OntologyClass) -> list[OntologyIndividualSuperclass]:
+        self._ensure_indexes()
+        return list(self._instances_by_class.get(cls, []))
+
+    @property
+    def rule_base(self) -> RuleBase:
+        if self._rule_base is None:
+            self._rule_base = RuleBase(extract_rules(self.get_rules()))
+        return self._rule_base
+
+    def get_rule_records(self) -> list[RuleRecord]:
+        return self.rule_base.rules
+
+    def invalidate_rules(self) -> None:
+        self._rule_base = None
+
+    def add_rule(self, rule: OntologyIndividualSuperclass | RuleRecord) -> RuleRecord:
+        record = extract_rule(rule)
+        self.rule_base.add_rule(record)
+        return record
+
+    def remove_rule(self, rule: OntologyIndividualSuperclass | RuleRecord | str) -> RuleRecord:
+        return self.rule_base.remove_rule(rule if isinstance(rule, str) else rule.name)
 
     def linguistic_values(self) -> dict[OntologyIndividualSuperclass, set[OntologyIndividualSuperclass]]:
-        lv_dict = {}
-        rules = self.get_rules()
-        for rule in rules:
-            premises = _get_premises(rule)
-            conclusions = _get_conclusions(rule)
-            for premise in premises:
-                left, right = _get_left_right_hands(premise)
-                if left not in lv_dict:
-                    lv_dict[left] = set()
-                if right not in lv_dict[left]:
-                    lv_dict[left].add(right)
-            for conclusion in conclusions:
-                left, right = _get_left_right_hands(conclusion)
-                if left not in lv_dict:
-                    lv_dict[left] = set()
-                if right not in lv_dict[left]:
-                    lv_dict[left].add(right)
-        return lv_dict
-
-    def linguistic_value_spaces(
-        self, linguistic_spaces: list[list[str]]
-    ) -> dict[str, dict[str, OntologyIndividualSuperclass]]:
-        lvals = self.linguistic_values()
-        lv_space = {}
-        for lvalue, items in lvals.items():
-            for space in linguistic_spaces:
-                if any([it in space for it in [v.name for v in items]]):
-                    print(f" Mapping LV {lvalue.name} to space {space}")
-                    lv_space[lvalue.name] = space
-                    continue
-        return lv_space
+        return {
+            self.get_individual_by_name(variable): {self.get_individual_by_name(term) for term in terms}
+            for variable, terms in self.rule_base.linguistic_values.items()
+        }
+
+    def linguistic_value_spaces(self, linguistic_spaces: list[list[str]]) -> dict[str, list[str]]:
+        return self.rule_base.linguistic_value_spaces(linguistic_spaces)
+
+    @property
+    def rule_graph(self) -> nx.DiGraph:
+        return self.rule_base.rule_graph
+
+    def _names(self, variables: Iterable[OntologyIndividualSuperclass | str | None]) -> list[str]:
+        return [variable_name(variable) for variable in variables if variable is not None]
+
+    def _individuals(self, names: Iterable[str]) -> set[OntologyIndividualSuperclass]:
+        return {self.get_individual_by_name(name) for name in names}
+
+    def get_reachable_variables(self, goals: list[OntologyIndividualSuperclass]) -> set[OntologyIndividualSuperclass]:
+        return self._individuals(reachable_variables(self.rule_graph, self._names(goals)))
+
+    def get_source_variables(self, goals: list[OntologyIndividualSuperclass]) -> set[OntologyIndividualSuperclass]:
+        return self._individuals(source_variables(self.rule_graph, self._names(goals)))
 
     def get_possible_chains(
         self, goals: list[OntologyIndividualSuperclass]
     ) -> tuple[list[set[OntologyIndividualSuperclass]], set[OntologyIndividualSuperclass]]:
-        def get_precedents(goal):
-            rules_class: ThingClass = self.ontology.RuleHeader
-            precedents = set()
-            input_individuals = set()
-            for rule in rules_class.instances():
-                conclusions = _get_conclusions(rule)
-                for conclusion in conclusions:
-                    left, _ = _get_left_right_hands(conclusion)
-                    if left == goal:
-                        precedents.add(rule)
-            for rule in precedents:
-                premises = _get_premises(rule)
-                for premise in premises:
-                    left, _ = _get_left_right_hands(premise)
-                    input_individuals.add(left)
-            return input_individuals
-
-        source_variables = set()
-        layer_inputs = [set(goals)]
-        i = 0
-        while True:
-            layer_inputs.append(set())
-            for goal in layer_inputs[i]:
-                precedents = get_precedents(goal)
-                if not precedents:
-                    source_variables.add(goal)
-                layer_inputs[i + 1] |= precedents
-            if not layer_inputs[i + 1]:
-                layer_inputs.pop()
-                break
-            i += 1
-
-        cleaned_layer_inputs = []
-        for layer in layer_inputs:
-            cleaned_layer = set()
-            for item in layer:
-                if item not in source_variables:
-                    cleaned_layer.add(item)
-            if cleaned_layer:
-                cleaned_layer_inputs.append(cleaned_layer)
-        return cleaned_layer_inputs, source_variables
+        layers, sources = self.rule_base.get_possible_chains(self._names(goals))
+        return [self._individuals(layer) for layer in layers], self._individuals(sources)
@@ -1,16 +1,28 @@
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import simpful
 from simpful import LinguisticVariable, TriangleFuzzySet
 
-from onto2robot.core import (
-    OntologyIndividualSuperclass,
-    rule_to_pair,
-    rule_to_string,
+from onto2robot.membership import MEMBERSHIP_BANK
+from onto2robot.rules import (
+    RuleRecord,
+    as_rule_records,
+    build_rule_graph,
+    goal_names,
+    possible_chains,
+    prune_to_goals,
+    rule_record_to_string,
+    variable_name,
 )
+from onto2robot.tracing import NULL_TRACER, NullTracer
 
 
 class FuzzySystem:
     def __init__(self):
-        self.fs = simpful.FuzzySystem()
+        # Quiet, rather than redirecting stdout around it: that is process-wide, and batches run on server threads
+        self.fs = simpful.FuzzySystem(show_banner=False, verbose=False)
 
     def add_fuzzy_set(
         self, variable_name: str, points: list[float], set_type: simpful.FuzzySet = simpful.TriangleFuzzySet
@@ -25,57 +37,49 @@ class SimpfulFuzzyWrapper:
     def _get_triangle_fuzzy_points(
         terms: list[str],
         universe: tuple[float, float],
-    ) -> list[TriangleFuzzySet]:
-        sets_no = len(terms)
-        if sets_no != 3:
-            raise ValueError("Currently only 3-term spaces are supported.")
-        first_points = [universe[0], universe[0], (universe[0] + universe[1]) / 3]
-        middle_points = [
-            universe[0],
-            (universe[0] + universe[1]) / 3,
-            universe[1],
-        ]
-        last_points = [(universe[0] + universe[1]) / 3, universe[1], universe[1]]
-        return {
-            terms[0]: TriangleFuzzySet(*first_points, term=terms[0]),
-            terms[1]: TriangleFuzzySet(*middle_points, term=terms[1]),
-            terms[2]: TriangleFuzzySet(*last_points, term=terms[2]),
-        }
+    ) -> dict[str, TriangleFuzzySet]:
+        points = MEMBERSHIP_BANK.simpful_points(len(terms), *universe)
+        return {term: TriangleFuzzySet(*map(float, abc), term=term) for term, abc in zip(terms, points, strict=True)}
 
     def __init__(
         self,
-        linguistic_variables_spaces: dict[str, dict[str, OntologyIndividualSuperclass]],
+        linguistic_variables_spaces: dict[str, list[str]],
         # TODO: The universe for each variable should be taken from the target system specification
         universe: tuple[float, float],
-        rules: list[OntologyIndividualSuperclass],
+        rules: list[RuleRecord],
+        goals: str | Iterable[str] | None = None,
+        tracer: NullTracer = NULL_TRACER,
     ):
+        self.tracer = tracer
         self.fs = FuzzySystem()
+        self.values = {}
         self.goals_inferred = {}
+        self.rules = as_rule_records(rules)
+        self.reasoning_order = None
+        if goals is not None:
+            self.rules, linguistic_variables_spaces = prune_to_goals(
+                self.rules, linguistic_variables_spaces, goal_names(goals)
+            )
+            self.reasoning_order, self.source_variables = possible_chains(
+                build_rule_graph(self.rules), goal_names(goals)
+            )
         self.linguistic_variables_spaces = linguistic_variables_spaces
+        self.universe = universe
 
         self.fuzzy_sets = {}
-        for terms in linguistic_variables_spaces.values():
-            fs_terms = self._get_triangle_fuzzy_points(terms, universe)
-            self.fuzzy_sets.update(fs_terms)
         self._add_linguistic_variables()
 
-        stringified_rules = [rule_to_string(rule) for rule in rules]
-
-        rnames = {}
-        for r in rules:
-            k, v = rule_to_pair(r)
-            rnames[k] = v
-
-        for k, v in sorted(rnames.items()):
-            print(f"{k} .  {v}")
+        stringified_rules = [rule_record_to_string(rule) for rule in self.rules]
         self.fs.fs.add_rules(stringified_rules)
 
     def _add_linguistic_variables(self):
         for lv_name, terms in self.linguistic_variables_spaces.items():
-            fs_list = [self.fuzzy_sets[term] for term in terms]
-            # TODO:replace with more generic method
-            self.fs.fs.add_linguistic_variable(lv_name, LinguisticVariable(fs_list, universe_of_discourse=[0, 40]))
-            print(f"Added linguistic variable {lv_name} with terms {terms}")
+            # simpful copies the sets of every variable it is given, so variables share the bank's points only
+            self.fuzzy_sets[lv_name] = self._get_triangle_fuzzy_points(terms, self.universe)
+            fs_list = list(self.fuzzy_sets[lv_name].values())
+            self.fs.fs.add_linguistic_variable(
+                lv_name, LinguisticVariable(fs_list, universe_of_discourse=list(self.universe))
+            )
 
     def set_start_values(
         self,
@@ -83,14 +87,102 @@ class SimpfulFuzzyWrapper:
     ):
         for var_name, value in input_values.items():
             self.fs.fs.set_variable(var_name, value)
+            self.values[var_name] = value
+
+    def compute(self, layer: set):
+        self.do_reasoning([variable_name(variable) for variable in layer])
 
-    def compute(self, layer: set[OntologyIndividualSuperclass]):
-        self.do_reasoning([ind.name for ind in layer])
+    def do_reasoning(self, goals: list[str], ignore_warnings: bool = False):
+        tracer = self.tracer
+        with tracer.span("layer", ",".join(sorted(goals))):
+            if tracer.enabled:
+                self._trace_firing_strengths(goals)
+            # returns crisp value(s)
+            goals_inferred = self.fs.fs.Mamdani_inference(goals, ignore_warnings=ignore_warnings)
+            for goal in goals:
+                goal_value = goals_inferred[goal]
+                self.fs.fs.set_variable(goal, goal_value)
+                self.values[goal] = goal_value
+                self.goals_inferred[goal] = goal_value
+                if tracer.enabled:
+                    tracer.inferred(goal, float(goal_value))
 
-    def do_reasoning(self, goals: list[str]):
-        goals_inferred = self.fs.fs.Mamdani_inference(goals)  # returns crisp value(s)
+    def _trace_firing_strengths(self, goals: list[str]):
+        # Not simpful's get_firing_strengths, which evaluates every rule, including those of layers not computed yet
         for goal in goals:
-            goal_value = goals_inferred[goal]
-            self.fs.fs.set_variable(goal, goal_value)
-            self.goals_inferred[goal] = goal_value
-            print(f" Inferred {goal} = {goal_value}")
+            self.tracer.firing_strengths(
+                goal,
+                {rule.name: self._firing_strength(rule) for rule in self.rules if rule.conclusion_variable == goal},
+            )
+
+    def _firing_strength(self, rule: RuleRecord) -> float:
+        # The premises are joined with AND, which simpful evaluates as the minimum
+        return min((self._membership(variable, term) for variable, term in rule.premises), default=1.0)
+
+    def _membership(self, lv_name: str, term: str) -> float:
+        return float(self.fuzzy_sets[lv_name][term].get_value(self.values[lv_name]))
+
+    def spec(self) -> dict:
+        """Picklable constructor arguments, to rebuild an equivalent wrapper in another process."""
+        return {
+            "linguistic_variables_spaces": self.linguistic_variables_spaces,
+            "universe": tuple(self.universe),
+            "rules": list(self.rules),
+        }
+
+    def compute_batch(
+        self,
+        inputs: dict[str, np.ndarray],
+        reasoning_order: list[set] | None = None,
+        workers: int = 1,
+        shards_per_worker: int = 4,
+    ) -> dict[str, np.ndarray]:
+        if reasoning_order is None:
+            reasoning_order = self.reasoning_order
+        if reasoning_order is None:
+            raise ValueError("reasoning_order is required when the wrapper was built without goals")
+        reasoning_order = [{variable_name(variable) for variable in layer} for layer in reasoning_order]
+        values = {var_name: np.atleast_1d(np.asarray(value, dtype=np.float64)) for var_name, value in inputs.items()}
+        samples = max((len(value) for value in values.values()), default=0)
+        if samples == 0:
+            # No inputs, or only empty ones: nothing to infer, and no shards to split it into
+            return {variable: np.empty(0) for layer in reasoning_order for variable in layer}
+        values = {var_name: np.broadcast_to(value, samples) for var_name, value in values.items()}
+
+        if workers <= 1:
+            return _compute_samples(self, values, reasoning_order)
+
+        # Contiguous shards, mapped in order, so the concatenated results keep the input order
+        shards = [
+            {var_name: value[indices] for var_name, value in values.items()}
+            for indices in np.array_split(np.arange(samples), min(samples, workers * shards_per_worker))
+        ]
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self.spec(),)) as executor:
+            results = list(executor.map(_compute_worker_shard, shards, [reasoning_order] * len(shards)))
+        return {var_name: np.concatenate([result[var_name] for result in results]) for var_name in results[0]}
+
+
+def _compute_samples(
+    wrapper: SimpfulFuzzyWrapper, inputs: dict[str, np.ndarray], reasoning_order: list[set[str]]
+) -> dict[str, np.ndarray]:
+    samples = len(next(iter(inputs.values())))
+    outputs = {variable: np.empty(samples) for layer in reasoning_order for variable in layer}
+    for i in range(samples):
+        wrapper.set_start_values({var_name: float(value[i]) for var_name, value in inputs.items()})
+        for layer in reversed(reasoning_order):
+            wrapper.do_reasoning(sorted(layer), ignore_warnings=True)
+        for var_name, output in outputs.items():
+            output[i] = wrapper.goals_inferred[var_name]
+    return outputs
+
+
+_worker_wrapper = None
+
+
+def _init_worker(spec: dict):
+    global _worker_wrapper
+    _worker_wrapper = SimpfulFuzzyWrapper(**spec)
+
+
+def _compute_worker_shard(inputs: dict[str, np.ndarray], reasoning_order: list[set[str]]) -> dict[str, np.ndarray]:
+    return _compute_samples(_worker_wrapper, inputs, reasoning_order)
@@ -0,0 +1,65 @@
+"""Layered inference over a reasoning order, shared by every fuzzy wrapper."""
+
+from onto2robot.rules import RuleRecord, as_rule_records, variable_name
+
+
+def run_layers(fs, input_values: dict[str, float], reasoning_order: list[set]) -> dict[str, float]:
+    fs.set_start_values(input_values)
+    for layer in reversed(reasoning_order):
+        fs.compute(layer)
+    return {
+        var_name: float(fs.goals_inferred[var_name])
+        for layer in reversed(reasoning_order)
+        for var_name in sorted(variable_name(variable) for variable in layer)
+        if var_name in fs.goals_inferred
+    }
+
+
+class IncrementalInference:
+    """Layered inference that recomputes only the variables downstream of changed inputs.
+
+    Readings persist between calls, so ``infer`` may be given only those that changed. A variable is recomputed when
+    one of its premise variables changed, either as a reading or as a recomputed value that came out different, and
+    everything else keeps its cached value.
+    """
+
+    def __init__(self, fs, reasoning_order: list[set], rules: list[RuleRecord] | None = None):
+        self.fs = fs
+        self.reasoning_order = [sorted(variable_name(variable) for variable in layer) for layer in reasoning_order]
+        self.premises = {}
+        for rule in as_rule_records(fs.rules if rules is None else rules):
+            self.premises.setdefault(rule.conclusion_variable, set()).update(rule.premise_variables)
+        self.inputs = {}
+        self.values = {}
+        self.recomputed = 0
+        self.reused = 0
+
+    def infer(self, input_values: dict[str, float]) -> dict[str, float]:
+        changed = {var_name for var_name, value in input_values.items() if self.inputs.get(var_name) != value}
+        # Kept apart until every layer is computed, a layer raising must leave the readings it missed changed
+        inputs = {**self.inputs, **input_values}
+        values = dict(self.values)
+        self.fs.set_start_values({**inputs, **values})
+        for layer in reversed(self.reasoning_order):
+            dirty = {
+                var_name
+                for var_name in layer
+                if var_name not in values or not self.premises.get(var_name, set()).isdisjoint(changed)
+            }
+            self.reused += len(layer) - len(dirty)
+            if not dirty:
+                continue
+            self.recomputed += len(dirty)
+            self.fs.compute(dirty)
+            for var_name in dirty & self.fs.goals_inferred.keys():
+                value = float(self.fs.goals_inferred[var_name])
+                if values.get(var_name) != value:
+                    changed.add(var_name)
+                    values[var_name] = value
+        self.inputs, self.values = inputs, values
+        return {
+            var_name: values[var_name]
+            for layer in reversed(self.reasoning_order)
+            for var_name in layer
+            if var_name in values
+        }
@@ -0,0 +1,121 @@
+"""Control surfaces: the whole layered inference sampled on a regular grid over the source variables.
+
+At runtime the goal values are read back with multilinear interpolation, which costs ``2 ** len(source_variables)``
+array reads per sample instead of a fuzzy simulation.
+"""
+
+import itertools
+from collections.abc import Iterable
+
+import numpy as np
+
+from onto2robot.rules import variable_name
+
+
+def evaluate_engine(engine, inputs: dict[str, np.ndarray], reasoning_order: list[set]) -> dict[str, np.ndarray]:
+    """Run the layers of ``reasoning_order`` on ``engine`` for every sample of ``inputs``."""
+    if hasattr(engine, "compute_batch"):
+        return engine.compute_batch(inputs, reasoning_order)
+
+    samples = len(next(iter(inputs.values())))
+    outputs = {}
+    for i in range(samples):
+        engine.set_start_values({var_name: float(values[i]) for var_name, values in inputs.items()})
+        for layer in reversed(reasoning_order):
+            engine.compute(layer)
+        for var_name, value in engine.goals_inferred.items():
+            outputs.setdefault(var_name, np.full(samples, np.nan))[i] = value
+    return outputs
+
+
+class LookupTable:
+    def __init__(self, source_variables: list[str], axes: list[np.ndarray], tables: dict[str, np.ndarray]):
+        self.source_variables = list(source_variables)
+        self.axes = [np.asarray(axis, dtype=np.float64) for axis in axes]
+        shape = tuple(len(axis) for axis in self.axes)
+        # All outputs share the grid, so one gather of flat indices reads every table at once
+        self._flat_tables = np.stack([np.asarray(table, dtype=np.float64).ravel() for table in tables.values()])
+        self.tables = {var_name: flat.reshape(shape) for var_name, flat in zip(tables, self._flat_tables, strict=True)}
+        self._strides = np.array([int(np.prod(shape[i + 1 :])) for i in range(len(shape))], dtype=np.intp)
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(self.axes))), dtype=np.intp)
+        self._bounds = np.array([[axis[0], axis[-1]] for axis in self.axes])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(axis.nbytes for axis in self.axes) + self._flat_tables.nbytes
+
+    def compute_batch(self, inputs: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        values = np.array(
+            np.broadcast_arrays(
+                *(np.atleast_1d(np.asarray(inputs[var_name], dtype=np.float64)) for var_name in self.source_variables)
+            )
+        )
+        # Like the fuzzy engines, values outside the sampled range are clipped to it
+        values = np.clip(values, self._bounds[:, :1], self._bounds[:, 1:])
+        lower = np.empty(values.shape, dtype=np.intp)
+        fractions = np.empty(values.shape)
+        for dim, axis in enumerate(self.axes):
+            index = np.clip(np.searchsorted(axis, values[dim], side="right") - 1, 0, len(axis) - 2)
+            lower[dim] = index
+            fractions[dim] = (values[dim] - axis[index]) / (axis[index + 1] - axis[index])
+
+        # corners x dims x samples
+        corners = self._corners[:, :, None]
+        weights = np.where(corners == 1, fractions, 1 - fractions).prod(axis=1)
+        flat_index = ((lower + corners) * self._strides[:, None]).sum(axis=1)
+        interpolated = (self._flat_tables[:, flat_index] * weights).sum(axis=1)
+        return dict(zip(self.tables, interpolated, strict=True))
+
+    def compute(self, input_values: dict[str, float]) -> dict[str, float]:
+        return {var_name: float(value[0]) for var_name, value in self.compute_batch(input_values).items()}
+
+
+def compile_lookup_table(
+    engine,
+    source_variables: Iterable,
+    reasoning_order: list[set],
+    resolution: int,
+    bounds: tuple[float, float],
+    outputs: Iterable | None = None,
+    max_cells: int = 10_000_000,
+) -> LookupTable:
+    """Sample ``engine`` at ``resolution`` points per source variable between ``bounds``.
+
+    ``outputs`` defaults to the goal layer, the first one of ``reasoning_order``.
+    """
+    source_variables = sorted(variable_name(variable) for variable in source_variables)
+    outputs = sorted(variable_name(variable) for variable in (outputs if outputs is not None else reasoning_order[0]))
+    if resolution < 2:
+        raise ValueError("resolution must be at least 2")
+    shape = (resolution,) * len(source_variables)
+    cells = resolution ** len(source_variables)
+    if cells > max_cells:
+        raise ValueError(
+            f"A {'x'.join(map(str, shape))} table has {cells} cells, more than max_cells={max_cells}; "
+            "lower the resolution or raise max_cells"
+        )
+
+    axes = [np.linspace(bounds[0], bounds[1], resolution) for _ in source_variables]
+    grid = np.meshgrid(*axes, indexing="ij")
+    inputs = {var_name: points.ravel() for var_name, points in zip(source_variables, grid, strict=True)}
+    sampled = evaluate_engine(engine, inputs, reasoning_order)
+    tables = {var_name: np.reshape(sampled[var_name], shape) for var_name in outputs}
+    return LookupTable(source_variables, axes, tables)
+
+
+def interpolation_error(
+    table: LookupTable,
+    engine,
+    reasoning_order: list[set],
+    samples: int = 1000,
+    seed: int | None = 0,
+) -> dict[str, float]:
+    """Maximum absolute difference between ``table`` and ``engine`` over uniformly random inputs."""
+    rng = np.random.default_rng(seed)
+    inputs = {
+        var_name: rng.uniform(axis[0], axis[-1], samples)
+        for var_name, axis in zip(table.source_variables, table.axes, strict=True)
+    }
+    expected = evaluate_engine(engine, inputs, reasoning_order)
+    interpolated = table.compute_batch(inputs)
+    return {var_name: float(np.max(np.abs(interpolated[var_name] - expected[var_name]))) for var_name in table.tables}
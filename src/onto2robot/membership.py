@@ -0,0 +1,87 @@
+"""Triangular partitions of a universe into N terms, spaced like skfuzzy ``automf``, shared across variables.
+
+Rule bases give most variables the same terms over the same universe, so ``MembershipBank`` computes each distinct
+partition once and hands the same read-only arrays to every variable using it. Memory and construction time then grow
+with the number of distinct spaces rather than with the number of variables.
+"""
+
+import numpy as np
+
+
+def triangular_membership(universe: np.ndarray, a: float, b: float, c: float) -> np.ndarray:
+    membership = np.zeros(len(universe))
+    if a != b:
+        left = (a < universe) & (universe < b)
+        membership[left] = (universe[left] - a) / float(b - a)
+    if b != c:
+        right = (b < universe) & (universe < c)
+        membership[right] = (c - universe[right]) / float(c - b)
+    membership[universe == b] = 1
+    return membership
+
+
+def automf_points(terms_no: int, universe: np.ndarray) -> list[tuple[float, float, float]]:
+    low, high = universe.min(), universe.max()
+    width = (high - low) / ((terms_no - 1) / 2.0)
+    return [(center - width / 2, center, center + width / 2) for center in np.linspace(low, high, terms_no)]
+
+
+class MembershipBank:
+    def __init__(self):
+        self._points = {}
+        self._memberships = {}
+        self._simpful_points = {}
+
+    def points(self, terms_no: int, low: float, high: float) -> np.ndarray:
+        """Triangle corners (terms x 3) of the partition of ``[low, high]``."""
+        if terms_no < 2:
+            raise ValueError(f"A partition needs at least 2 terms, got {terms_no}")
+        key = (terms_no, float(low), float(high))
+        points = self._points.get(key)
+        if points is None:
+            points = self._points[key] = np.array(automf_points(terms_no, np.array([low, high], dtype=np.float64)))
+            points.setflags(write=False)
+        return points
+
+    def memberships(self, terms_no: int, universe: np.ndarray) -> np.ndarray:
+        """Memberships (terms x universe points) of the partition, sampled on ``universe``."""
+        universe = np.asarray(universe)
+        key = (terms_no, universe.dtype.str, universe.tobytes())
+        memberships = self._memberships.get(key)
+        if memberships is None:
+            points = self.points(terms_no, universe.min(), universe.max())
+            memberships = self._memberships[key] = np.array([triangular_membership(universe, *abc) for abc in points])
+            memberships.setflags(write=False)
+        return memberships
+
+    def simpful_points(self, terms_no: int, low: float, high: float) -> np.ndarray:
+        """Triangle corners of the simpful backend's partition: its own shape for 3 terms, ``points`` otherwise."""
+        if terms_no != 3:
+            return self.points(terms_no, low, high)
+        key = (terms_no, float(low), float(high))
+        points = self._simpful_points.get(key)
+        if points is None:
+            # The shape simpful controllers have always been built with, kept so their outputs do not change
+            peak = (low + high) / 3
+            points = self._simpful_points[key] = np.array([[low, low, peak], [low, peak, high], [peak, high, high]])
+            points.setflags(write=False)
+        return points
+
+    def clear(self):
+        self._points.clear()
+        self._memberships.clear()
+        self._simpful_points.clear()
+
+    def stats(self) -> dict:
+        return {
+            "partitions": len(self._points),
+            "membership_arrays": len(self._memberships),
+            "simpful_partitions": len(self._simpful_points),
+            "nbytes": sum(
+                array.nbytes
+                for array in [*self._points.values(), *self._memberships.values(), *self._simpful_points.values()]
+            ),
+        }
+
+
+MEMBERSHIP_BANK = MembershipBank()
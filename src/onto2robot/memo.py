@@ -0,0 +1,89 @@
+"""LRU cache of inference results, keyed on the input values quantized to a fixed step.
+
+``MemoizedEngine`` wraps any fuzzy wrapper and offers the same ``set_start_values``/``compute``/``goals_inferred``
+interface, so it fits wherever an engine does (``run_layers``, the CLI stream mode, ``ControlLoop``). Inputs falling
+in the same cell of the ``step`` grid share one cache entry, and layers already in the entry are not computed again.
+
+Error bound: the engine always runs on the cell centre, ``round(value / step) * step``, so every input it sees is off
+by at most ``step / 2`` and results do not depend on which reading filled the entry. Where the inferred values vary
+continuously with the inputs, the error is at most ``step / 2`` times the sum of their sensitivities to the inputs.
+Mean of maximum defuzzification is not continuous, so an input within ``step / 2`` of a switching point may get the
+value of the neighbouring plateau. Choose ``step`` below the sensor noise, where such readings are indistinguishable
+anyway.
+"""
+
+from collections import OrderedDict
+
+from onto2robot.rules import variable_name
+
+
+class MemoizedEngine:
+    def __init__(self, fs, step: float, max_size: int = 4096):
+        if step <= 0:
+            raise ValueError("The quantization step must be positive")
+        self.fs = fs
+        self.step = step
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.goals_inferred = {}
+        self._cache = OrderedDict()
+        self._inputs = {}
+        self._started = False
+        # Key of a new entry, cached only once a layer of it computed successfully
+        self._new_key = None
+
+    def __getattr__(self, name: str):
+        # reasoning_order, source_variables, tracer, ... of the wrapped engine
+        return getattr(self.fs, name)
+
+    def key(self, input_values: dict[str, float]) -> tuple[tuple[str, int], ...]:
+        return tuple(sorted((var_name, round(value / self.step)) for var_name, value in input_values.items()))
+
+    def set_start_values(self, input_values: dict[str, float]):
+        key = self.key(input_values)
+        entry = self._cache.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = {}
+            self._new_key = key
+        else:
+            self._new_key = None
+            self.hits += 1
+            self._cache.move_to_end(key)
+        self.goals_inferred = entry
+        self._inputs = {var_name: cell * self.step for var_name, cell in key}
+        self._started = False
+
+    def compute(self, layer: set):
+        missing = [var_name for var_name in map(variable_name, layer) if var_name not in self.goals_inferred]
+        if not missing:
+            return
+        if not self._started:
+            # Values cached from earlier layers stand in for computing them again
+            self.fs.set_start_values({**self._inputs, **self.goals_inferred})
+            self._started = True
+        self.fs.compute(layer)
+        for var_name in missing:
+            if var_name in self.fs.goals_inferred:
+                self.goals_inferred[var_name] = self.fs.goals_inferred[var_name]
+        if self._new_key is not None:
+            self._cache[self._new_key] = self.goals_inferred
+            self._new_key = None
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._cache),
+            "max_size": self.max_size,
+            "step": self.step,
+        }
@@ -0,0 +1,266 @@
+"""Vectorized Mamdani inference over a whole batch of samples, using only NumPy.
+
+The membership functions, min/max operators and upsampled mean-of-maximum defuzzification follow
+``ScikitFuzzyWrapper`` (skfuzzy ``automf`` partitions, ``defuzzify_method="mom"``), so both backends agree.
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from onto2robot.membership import MEMBERSHIP_BANK
+from onto2robot.rules import (
+    RuleRecord,
+    as_rule_records,
+    build_rule_graph,
+    goal_names,
+    possible_chains,
+    prune_to_goals,
+    variable_name,
+)
+from onto2robot.tracing import NULL_TRACER, NullTracer
+
+
+def mean_of_maximum(universe: np.ndarray, memberships: np.ndarray, cuts: np.ndarray) -> np.ndarray:
+    """Defuzzify clipped, max-aggregated terms for every row of ``cuts`` (shape samples x terms).
+
+    Like skfuzzy, the universe is upsampled with the points where each term crosses its cut level before the
+    maximum is searched for, so plateaus between two grid points are not lost.
+    """
+    samples = cuts.shape[0]
+    candidates = [np.broadcast_to(universe, (samples, len(universe)))]
+    steps = np.diff(universe)
+    for term, membership in enumerate(memberships):
+        level = cuts[:, term : term + 1]
+        above = np.where(level == 0, membership > level, membership >= level)
+        crossing = np.diff(above, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            points = universe[:-1] + (level - membership[:-1]) * steps / np.diff(membership)
+        candidates.append(np.where(crossing, points, np.nan))
+
+    points = np.sort(np.concatenate(candidates, axis=1), axis=1)
+    valid = ~np.isnan(points)
+    valid[:, 1:] &= points[:, 1:] != points[:, :-1]
+
+    output = np.zeros(points.shape)
+    for term, membership in enumerate(memberships):
+        clipped = np.minimum(cuts[:, term : term + 1], np.interp(points, universe, membership, left=0.0, right=0.0))
+        np.maximum(output, clipped, out=output, where=valid)
+    output[~valid] = -np.inf
+    at_maximum = output == output.max(axis=1, keepdims=True)
+    return np.where(at_maximum, points, 0.0).sum(axis=1) / at_maximum.sum(axis=1)
+
+
+# Below this many rules, evaluating them all costs less than looking up the active ones
+SPARSE_MIN_RULES = 512
+
+
+class CompiledVariableRules:
+    """Rules concluding one variable, as index matrices into the stacked premise memberships."""
+
+    def __init__(self, rules: list[RuleRecord], term_indices: dict[str, dict[str, int]]):
+        self.rule_names = [rule.name for rule in rules]
+        self.premise_variables = list(dict.fromkeys(variable for rule in rules for variable in rule.premise_variables))
+        offsets = {}
+        width = 0
+        for variable in self.premise_variables:
+            offsets[variable] = width
+            width += len(term_indices[variable])
+        # The extra last column holds ones, so rules with fewer premises are padded without changing the minimum
+        padding = width
+        premises_no = max((len(rule.premises) for rule in rules), default=0)
+        self.premise_index = np.full((len(rules), premises_no), padding, dtype=np.intp)
+        for i, rule in enumerate(rules):
+            for j, (variable, term) in enumerate(rule.premises):
+                self.premise_index[i, j] = offsets[variable] + term_indices[variable][term]
+        conclusion_variable = rules[0].conclusion_variable
+        self.conclusion_terms = np.array([term_indices[conclusion_variable][rule.conclusion[1]] for rule in rules])
+        self.used_terms = np.unique(self.conclusion_terms)
+        self.conclusion_positions = np.searchsorted(self.used_terms, self.conclusion_terms)
+
+        # Rules indexed by (variable, term) premise column: the rules of column c are
+        # premise_rules[premise_rules_start[c]:premise_rules_start[c + 1]]
+        rule_ids = np.repeat(np.arange(len(rules)), premises_no)
+        columns = self.premise_index.ravel()
+        pairs = np.unique(np.stack([columns, rule_ids], axis=1)[columns != padding], axis=0)
+        self.premise_rules = pairs[:, 1]
+        self.premise_rules_start = np.searchsorted(pairs[:, 0], np.arange(width + 1))
+        self.premises_per_rule = np.bincount(self.premise_rules, minlength=len(rules))
+
+    def firing_strengths(self, premise_memberships: np.ndarray) -> np.ndarray:
+        padded = np.concatenate([premise_memberships, np.ones((premise_memberships.shape[0], 1))], axis=1)
+        return np.fmin.reduce(padded[:, self.premise_index], axis=2)
+
+    def cuts(self, firing: np.ndarray) -> np.ndarray:
+        return np.stack(
+            [np.fmax.reduce(firing[:, self.conclusion_terms == term], axis=1) for term in self.used_terms], axis=1
+        )
+
+    def active_rules(self, premise_memberships: np.ndarray) -> np.ndarray:
+        """Rules whose premises all have nonzero membership in some sample, the only ones which can fire."""
+        active_columns = np.flatnonzero((premise_memberships > 0).any(axis=0))
+        starts, ends = self.premise_rules_start[active_columns], self.premise_rules_start[active_columns + 1]
+        candidates = np.concatenate(
+            [
+                np.empty(0, dtype=np.intp),
+                *(self.premise_rules[start:end] for start, end in zip(starts, ends, strict=True)),
+            ]
+        )
+        # Counting is linear in the rules of the active columns, where sorting them to find duplicates is not
+        active_premises = np.bincount(candidates, minlength=len(self.premises_per_rule))
+        return np.flatnonzero(active_premises == self.premises_per_rule)
+
+    def sparse_firing_strengths(self, premise_memberships: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """The active rules, and their firing strengths (samples x active rules). All other rules have strength 0."""
+        rules = self.active_rules(premise_memberships)
+        padded = np.concatenate([premise_memberships, np.ones((premise_memberships.shape[0], 1))], axis=1)
+        return rules, np.fmin.reduce(padded[:, self.premise_index[rules]], axis=2)
+
+    def sparse_cuts(self, rules: np.ndarray, firing: np.ndarray) -> np.ndarray:
+        cuts = np.zeros((firing.shape[0], len(self.used_terms)))
+        positions = self.conclusion_positions[rules]
+        for position in np.unique(positions):
+            cuts[:, position] = np.fmax.reduce(firing[:, positions == position], axis=1)
+        return cuts
+
+
+class NumpyFuzzyWrapper:
+    def __init__(
+        self,
+        linguistic_variables_spaces: dict[str, list[str]],
+        # TODO: The universe for each variable should be taken from the target system specification
+        universe: np.ndarray,
+        rules: list[RuleRecord],
+        goals: str | Iterable[str] | None = None,
+        tracer: NullTracer = NULL_TRACER,
+        sparse: bool = True,
+    ):
+        self.tracer = tracer
+        # Evaluate only the rules whose premises all have nonzero membership, for variables with many rules
+        self.sparse = sparse
+        self.rules = as_rule_records(rules)
+        self.reasoning_order = None
+        if goals is not None:
+            self.rules, linguistic_variables_spaces = prune_to_goals(
+                self.rules, linguistic_variables_spaces, goal_names(goals)
+            )
+            self.reasoning_order, self.source_variables = possible_chains(
+                build_rule_graph(self.rules), goal_names(goals)
+            )
+        self.linguistic_variables_spaces = linguistic_variables_spaces
+        self.universe = np.asarray(universe, dtype=np.float64)
+        self.memberships = {
+            lv_name: MEMBERSHIP_BANK.memberships(len(terms), self.universe)
+            for lv_name, terms in linguistic_variables_spaces.items()
+        }
+        term_indices = {
+            lv_name: {term: i for i, term in enumerate(terms)} for lv_name, terms in linguistic_variables_spaces.items()
+        }
+        rules_by_conclusion = {}
+        for rule in self.rules:
+            rules_by_conclusion.setdefault(rule.conclusion_variable, []).append(rule)
+        self.compiled_rules = {
+            lv_name: CompiledVariableRules(var_rules, term_indices)
+            for lv_name, var_rules in rules_by_conclusion.items()
+        }
+        self.values = {}
+        self.goals_inferred = {}
+        self.ticks = 0
+        self.rules_total = 0
+        self.rules_evaluated = 0
+        self.rules_fired = 0
+
+    def default_value(self) -> float:
+        return (self.universe.min() + self.universe.max()) / 2
+
+    def fuzzify(self, lv_name: str, values: np.ndarray) -> np.ndarray:
+        # Out of range inputs are clipped to the universe, as skfuzzy does
+        values = np.clip(values, self.universe[0], self.universe[-1])
+        return np.stack(
+            [
+                np.interp(values, self.universe, membership, left=0.0, right=0.0)
+                for membership in self.memberships[lv_name]
+            ],
+            axis=-1,
+        )
+
+    def infer_variable(self, lv_name: str, values: dict[str, np.ndarray]) -> np.ndarray:
+        return self._infer_variable(lv_name, values)[0]
+
+    def _infer_variable(self, lv_name: str, values: dict[str, np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Inferred values, the indices of the evaluated rules and their firing strengths (samples x rules)."""
+        compiled = self.compiled_rules[lv_name]
+        samples = max((len(value) for value in values.values()), default=1)
+        premise_memberships = np.concatenate(
+            [
+                self.fuzzify(variable, np.broadcast_to(values.get(variable, self.default_value()), samples))
+                for variable in compiled.premise_variables
+            ],
+            axis=1,
+        )
+        if self.sparse and len(compiled.rule_names) >= SPARSE_MIN_RULES:
+            rules, firing = compiled.sparse_firing_strengths(premise_memberships)
+            cuts = compiled.sparse_cuts(rules, firing)
+        else:
+            rules = np.arange(len(compiled.rule_names))
+            firing = compiled.firing_strengths(premise_memberships)
+            cuts = compiled.cuts(firing)
+        return self.defuzzify(lv_name, compiled.used_terms, cuts), rules, firing
+
+    def defuzzify(self, lv_name: str, used_terms: np.ndarray, cuts: np.ndarray) -> np.ndarray:
+        return mean_of_maximum(self.universe, self.memberships[lv_name][used_terms], cuts)
+
+    def compute_batch(
+        self, inputs: dict[str, np.ndarray], reasoning_order: list[set] | None = None
+    ) -> dict[str, np.ndarray]:
+        if reasoning_order is None:
+            reasoning_order = self.reasoning_order
+        if reasoning_order is None:
+            raise ValueError("reasoning_order is required when the wrapper was built without goals")
+        values = {var_name: np.atleast_1d(np.asarray(value, dtype=np.float64)) for var_name, value in inputs.items()}
+        outputs = {}
+        for layer in reversed(reasoning_order):
+            layer_outputs = {
+                var_name: self.infer_variable(var_name, values)
+                for var_name in (variable_name(variable) for variable in layer)
+            }
+            values.update(layer_outputs)
+            outputs.update(layer_outputs)
+        return outputs
+
+    def set_start_values(
+        self,
+        input_values: dict[str, float],
+    ):
+        self.values = {var_name: np.array([value], dtype=np.float64) for var_name, value in input_values.items()}
+        self.ticks += 1
+
+    def compute(self, layer: set):
+        tracer = self.tracer
+        layer_var_names = sorted(variable_name(variable) for variable in layer)
+        with tracer.span("layer", ",".join(layer_var_names)):
+            layer_outputs = {var_name: self._infer_variable(var_name, self.values) for var_name in layer_var_names}
+            for var_name, (output, rules, firing) in layer_outputs.items():
+                self.values[var_name] = output
+                self.goals_inferred[var_name] = float(output[0])
+                rule_names = self.compiled_rules[var_name].rule_names
+                self.rules_total += len(rule_names)
+                self.rules_evaluated += len(rules)
+                self.rules_fired += int(np.count_nonzero(firing[0]))
+                if tracer.enabled:
+                    strengths = dict.fromkeys(rule_names, 0.0)
+                    strengths.update(zip((rule_names[rule] for rule in rules), firing[0].tolist(), strict=True))
+                    tracer.firing_strengths(var_name, strengths)
+                    tracer.inferred(var_name, self.goals_inferred[var_name])
+
+    def activation_stats(self) -> dict:
+        """Rules of the computed variables, evaluated and fired (nonzero strength), per ``set_start_values`` tick."""
+        ticks = max(self.ticks, 1)
+        return {
+            "ticks": self.ticks,
+            "sparse": self.sparse,
+            "rules_per_tick": self.rules_total / ticks,
+            "evaluated_per_tick": self.rules_evaluated / ticks,
+            "fired_per_tick": self.rules_fired / ticks,
+            "evaluated_fraction": self.rules_evaluated / self.rules_total if self.rules_total else 0.0,
+        }
@@ -0,0 +1,247 @@
+"""Ontology-independent rule records and the rule dependency graph built from them."""
+
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import networkx as nx
+
+Assignment = tuple[str, str]
+
+
+@dataclass(frozen=True, slots=True)
+class RuleRecord:
+    name: str
+    premises: tuple[Assignment, ...]
+    conclusion: Assignment
+
+    @property
+    def premise_variables(self) -> tuple[str, ...]:
+        return tuple(variable for variable, _ in self.premises)
+
+    @property
+    def conclusion_variable(self) -> str:
+        return self.conclusion[0]
+
+
+def variable_name(variable) -> str:
+    return variable if isinstance(variable, str) else variable.name
+
+
+def as_rule_records(rules: Iterable) -> list[RuleRecord]:
+    rules = list(rules)
+    if all(isinstance(rule, RuleRecord) for rule in rules):
+        return rules
+    # Ontology individuals are only converted when given, so owlready2 is not imported otherwise
+    from onto2robot.core import extract_rules
+
+    return extract_rules(rules)
+
+
+def rule_record_to_string(rule: RuleRecord) -> str:
+    premise_str = " AND ".join(f"({variable} IS {term})" for variable, term in rule.premises)
+    variable, term = rule.conclusion
+    return f"IF {premise_str} THEN ({variable} IS {term});"
+
+
+def linguistic_value_names(rules: Iterable[RuleRecord]) -> dict[str, set[str]]:
+    lv_dict = {}
+    for rule in rules:
+        for variable, term in (*rule.premises, rule.conclusion):
+            lv_dict.setdefault(variable, set()).add(term)
+    return lv_dict
+
+
+def map_linguistic_spaces(
+    linguistic_values: dict[str, set[str]], linguistic_spaces: list[list[str]]
+) -> dict[str, list[str]]:
+    lv_space = {}
+    for lvalue, items in linguistic_values.items():
+        for space in linguistic_spaces:
+            if any(it in space for it in items):
+                lv_space[lvalue] = space
+    return lv_space
+
+
+def add_rule_to_graph(graph: "nx.DiGraph", rule: RuleRecord) -> None:
+    conclusion_variable = rule.conclusion_variable
+    graph.add_node(conclusion_variable)
+    graph.nodes[conclusion_variable].setdefault("rules", set()).add(rule)
+    for premise_variable in rule.premise_variables:
+        graph.add_edge(premise_variable, conclusion_variable)
+        graph.edges[premise_variable, conclusion_variable].setdefault("rules", set()).add(rule)
+
+
+def remove_rule_from_graph(graph: "nx.DiGraph", rule: RuleRecord) -> None:
+    conclusion_variable = rule.conclusion_variable
+    for premise_variable in rule.premise_variables:
+        if graph.has_edge(premise_variable, conclusion_variable):
+            edge_rules = graph.edges[premise_variable, conclusion_variable]["rules"]
+            edge_rules.discard(rule)
+            if not edge_rules:
+                graph.remove_edge(premise_variable, conclusion_variable)
+    if conclusion_variable in graph:
+        graph.nodes[conclusion_variable].get("rules", set()).discard(rule)
+    # Drop variables no remaining rule refers to
+    for variable in {conclusion_variable, *rule.premise_variables}:
+        if variable in graph and graph.degree(variable) == 0 and not graph.nodes[variable].get("rules"):
+            graph.remove_node(variable)
+
+
+def build_rule_graph(rules: Iterable[RuleRecord]) -> "nx.DiGraph":
+    # networkx takes a while to import; rule bases loaded with cached chains never need the graph
+    import networkx as nx
+
+    graph = nx.DiGraph()
+    for rule in rules:
+        add_rule_to_graph(graph, rule)
+    return graph
+
+
+def precedents(graph: "nx.DiGraph", variable: str) -> set[str]:
+    if variable not in graph:
+        return set()
+    return set(graph.predecessors(variable))
+
+
+def reachable_variables(graph: "nx.DiGraph", goals: Iterable[str]) -> set[str]:
+    import networkx as nx
+
+    reachable = set(goals)
+    for goal in list(reachable):
+        if goal in graph:
+            reachable |= nx.ancestors(graph, goal)
+    return reachable
+
+
+def source_variables(graph: "nx.DiGraph", goals: Iterable[str]) -> set[str]:
+    return {variable for variable in reachable_variables(graph, goals) if not precedents(graph, variable)}
+
+
+def goal_names(goals: str | Iterable) -> list[str]:
+    return [goals] if isinstance(goals, str) else [variable_name(goal) for goal in goals]
+
+
+def prune_to_goals(
+    rules: list[RuleRecord], linguistic_variables_spaces: dict[str, list[str]], goals: Iterable[str]
+) -> tuple[list[RuleRecord], dict[str, list[str]]]:
+    # Rules concluding a backward-reachable variable have only backward-reachable premises
+    reachable = reachable_variables(build_rule_graph(rules), goals)
+    pruned_rules = [rule for rule in rules if rule.conclusion_variable in reachable]
+    pruned_spaces = {name: terms for name, terms in linguistic_variables_spaces.items() if name in reachable}
+    return pruned_rules, pruned_spaces
+
+
+def possible_chains(graph: "nx.DiGraph", goals: Iterable[str]) -> tuple[list[set[str]], set[str]]:
+    sources = set()
+    layer_inputs = [set(goals)]
+    while True:
+        next_layer = set()
+        for goal in layer_inputs[-1]:
+            goal_precedents = precedents(graph, goal)
+            if not goal_precedents:
+                sources.add(goal)
+            next_layer |= goal_precedents
+        if not next_layer:
+            break
+        layer_inputs.append(next_layer)
+
+    cleaned_layer_inputs = []
+    for layer in layer_inputs:
+        cleaned_layer = layer - sources
+        if cleaned_layer:
+            cleaned_layer_inputs.append(cleaned_layer)
+    return cleaned_layer_inputs, sources
+
+
+class RuleBase:
+    def __init__(
+        self,
+        rules: Iterable[RuleRecord],
+        linguistic_values: dict[str, set[str]] | None = None,
+        chains: dict[tuple[str, ...], tuple[list[set[str]], set[str]]] | None = None,
+    ) -> None:
+        self._rules = {rule.name: rule for rule in rules}
+        self._linguistic_values = linguistic_values
+        self._term_counts = None
+        self._rule_graph = None
+        self.chains = chains if chains is not None else {}
+
+    @property
+    def rules(self) -> list[RuleRecord]:
+        return list(self._rules.values())
+
+    def get_rule(self, name: str) -> RuleRecord | None:
+        return self._rules.get(name)
+
+    @property
+    def linguistic_values(self) -> dict[str, set[str]]:
+        if self._linguistic_values is None:
+            self._linguistic_values = {}
+            for variable, term in self._ensure_term_counts():
+                self._linguistic_values.setdefault(variable, set()).add(term)
+        return self._linguistic_values
+
+    @property
+    def rule_graph(self) -> "nx.DiGraph":
+        if self._rule_graph is None:
+            self._rule_graph = build_rule_graph(self._rules.values())
+        return self._rule_graph
+
+    def linguistic_value_spaces(self, linguistic_spaces: list[list[str]]) -> dict[str, list[str]]:
+        return map_linguistic_spaces(self.linguistic_values, linguistic_spaces)
+
+    def get_possible_chains(self, goals: Iterable[str]) -> tuple[list[set[str]], set[str]]:
+        key = tuple(sorted(set(goals)))
+        if key not in self.chains:
+            self.chains[key] = possible_chains(self.rule_graph, key)
+        return self.chains[key]
+
+    def _ensure_term_counts(self) -> Counter:
+        # How many rules use each (variable, term), so a term leaves the linguistic values with its last rule
+        if self._term_counts is None:
+            self._term_counts = Counter(
+                assignment for rule in self._rules.values() for assignment in (*rule.premises, rule.conclusion)
+            )
+        return self._term_counts
+
+    def _invalidate_chains(self, rule: RuleRecord) -> None:
+        variable = rule.conclusion_variable
+        self.chains = {
+            goals: (layers, sources)
+            for goals, (layers, sources) in self.chains.items()
+            if variable not in goals and variable not in sources and not any(variable in layer for layer in layers)
+        }
+
+    def add_rule(self, rule: RuleRecord) -> None:
+        if rule.name in self._rules:
+            self.remove_rule(rule.name)
+        if self._linguistic_values is not None:
+            term_counts = self._ensure_term_counts()
+            for variable, term in (*rule.premises, rule.conclusion):
+                term_counts[variable, term] += 1
+                self._linguistic_values.setdefault(variable, set()).add(term)
+        self._rules[rule.name] = rule
+        if self._rule_graph is not None:
+            add_rule_to_graph(self._rule_graph, rule)
+        self._invalidate_chains(rule)
+
+    def remove_rule(self, name: str) -> RuleRecord:
+        if self._linguistic_values is not None:
+            self._ensure_term_counts()
+        rule = self._rules.pop(name)
+        if self._linguistic_values is not None:
+            term_counts = self._term_counts
+            for variable, term in (*rule.premises, rule.conclusion):
+                term_counts[variable, term] -= 1
+                if term_counts[variable, term] <= 0:
+                    del term_counts[variable, term]
+                    self._linguistic_values[variable].discard(term)
+                    if not self._linguistic_values[variable]:
+                        del self._linguistic_values[variable]
+        if self._rule_graph is not None:
+            remove_rule_from_graph(self._rule_graph, rule)
+        self._invalidate_chains(rule)
+        return rule
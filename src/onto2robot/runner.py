@@ -0,0 +1,157 @@
+"""Fixed-rate control loop: read the sources, run the reasoning order layers and write the sinks on every tick."""
+
+import asyncio
+import inspect
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Protocol
+
+import numpy as np
+
+from onto2robot.inference import run_layers
+
+
+class Source(Protocol):
+    async def read(self) -> dict[str, float]: ...
+
+
+class Sink(Protocol):
+    async def write(self, outputs: dict[str, float]) -> None: ...
+
+
+class FunctionSource:
+    """Input values returned by a plain or async function."""
+
+    def __init__(self, func: Callable[[], dict[str, float]]):
+        self.func = func
+
+    async def read(self) -> dict[str, float]:
+        values = self.func()
+        return await values if inspect.isawaitable(values) else values
+
+
+class LatestValueSource:
+    """Input values pushed by a producer; each tick uses the newest ones, readings never block the loop."""
+
+    def __init__(self, initial: dict[str, float] | None = None):
+        self.values = dict(initial or {})
+
+    def push(self, values: dict[str, float]) -> None:
+        self.values.update(values)
+
+    async def read(self) -> dict[str, float]:
+        return dict(self.values)
+
+
+class FunctionSink:
+    def __init__(self, func: Callable[[dict[str, float]], None]):
+        self.func = func
+
+    async def write(self, outputs: dict[str, float]) -> None:
+        result = self.func(outputs)
+        if inspect.isawaitable(result):
+            await result
+
+
+class RunnerStats:
+    def __init__(self, period: float, window: int = 10_000):
+        self.period = period
+        self.ticks = 0
+        self.deadline_misses = 0
+        self.skipped_ticks = 0
+        # Only the latest ticks are kept, so long runs use bounded memory
+        self.jitter = deque(maxlen=window)
+        self.tick_durations = deque(maxlen=window)
+        self.inference_durations = deque(maxlen=window)
+
+    def summary(self) -> dict:
+        def describe(samples: deque) -> dict:
+            if not samples:
+                return {}
+            values = np.array(samples)
+            return {"mean": float(values.mean()), "p99": float(np.percentile(values, 99)), "max": float(values.max())}
+
+        return {
+            "period": self.period,
+            "ticks": self.ticks,
+            "deadline_misses": self.deadline_misses,
+            "skipped_ticks": self.skipped_ticks,
+            "jitter": describe(self.jitter),
+            "tick_duration": describe(self.tick_durations),
+            "inference_duration": describe(self.inference_durations),
+        }
+
+
+class ControlLoop:
+    """Runs ``fs`` every ``period`` seconds.
+
+    Inference is offloaded to ``executor`` (by default one dedicated thread, as the wrappers are not thread safe), so
+    the event loop keeps serving sources and sinks meanwhile. A tick that ends after the next one was due is a
+    deadline miss; ticks whose start time has already passed are skipped instead of run late in a burst.
+    """
+
+    def __init__(
+        self,
+        fs,
+        reasoning_order: list[set],
+        sources: list[Source],
+        sinks: list[Sink],
+        period: float,
+        executor: Executor | None = None,
+    ):
+        self.fs = fs
+        self.reasoning_order = reasoning_order
+        self.sources = sources
+        self.sinks = sinks
+        self.period = period
+        self.executor = executor
+        self.stats = RunnerStats(period)
+        self._stopped = False
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    async def tick(self) -> dict[str, float]:
+        input_values = {}
+        for values in await asyncio.gather(*(source.read() for source in self.sources)):
+            input_values.update(values)
+        start = time.perf_counter()
+        outputs = await asyncio.get_running_loop().run_in_executor(
+            self.executor, run_layers, self.fs, input_values, self.reasoning_order
+        )
+        self.stats.inference_durations.append(time.perf_counter() - start)
+        await asyncio.gather(*(sink.write(outputs) for sink in self.sinks))
+        return outputs
+
+    async def run(self, ticks: int | None = None) -> RunnerStats:
+        owns_executor = self.executor is None
+        if owns_executor:
+            self.executor = ThreadPoolExecutor(1, thread_name_prefix="onto2robot-inference")
+        self._stopped = False
+        try:
+            start = time.perf_counter()
+            tick_no = 0
+            ticks_run = 0
+            while not self._stopped and (ticks is None or ticks_run < ticks):
+                scheduled = start + tick_no * self.period
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                woke = time.perf_counter()
+                self.stats.jitter.append(woke - scheduled)
+
+                await self.tick()
+                done = time.perf_counter()
+                ticks_run += 1
+                self.stats.ticks += 1
+                self.stats.tick_durations.append(done - woke)
+                if done > scheduled + self.period:
+                    self.stats.deadline_misses += 1
+                next_tick_no = max(tick_no + 1, int((done - start) / self.period) + 1)
+                self.stats.skipped_ticks += next_tick_no - tick_no - 1
+                tick_no = next_tick_no
+        finally:
+            if owns_executor:
+                self.executor.shutdown(wait=False)
+                self.executor = None
+        return self.stats
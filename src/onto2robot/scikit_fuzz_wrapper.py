@@ -1,11 +1,29 @@
+from collections.abc import Iterable
+
 import numpy as np
 from skfuzzy import control as ctrl
 
-from onto2robot.core import OntologyIndividualSuperclass, _get_conclusions, _get_left_right_hands, _get_premises
+from onto2robot.membership import MEMBERSHIP_BANK
+from onto2robot.rules import (
+    RuleRecord,
+    as_rule_records,
+    build_rule_graph,
+    goal_names,
+    possible_chains,
+    prune_to_goals,
+    variable_name,
+)
+from onto2robot.tracing import NULL_TRACER, NullTracer
+
+
+def add_terms(variable: ctrl.Antecedent | ctrl.Consequent, terms: list[str]):
+    # Same partition as automf, with the membership arrays shared by every variable over this universe
+    for term, membership in zip(terms, MEMBERSHIP_BANK.memberships(len(terms), variable.universe), strict=True):
+        variable[term] = membership
 
 
 def make_antecedents(
-    linguistic_variables_spaces: dict[str, dict[str, OntologyIndividualSuperclass]],
+    linguistic_variables_spaces: dict[str, list[str]],
     goal_name: str,
     universe: np.ndarray,
 ) -> dict[str, ctrl.Antecedent]:
@@ -14,63 +32,71 @@ def make_antecedents(
         # Add once and do not add the ultimate goal (never used as a premise)
         if lv_name != goal_name and lv_name not in antecedents:
             antecedents[lv_name] = ctrl.Antecedent(universe, lv_name)
-            antecedents[lv_name].automf(len(terms), names=terms)
+            add_terms(antecedents[lv_name], terms)
     return antecedents
 
 
 def make_consequents(
-    rules: list[OntologyIndividualSuperclass],
-    linguistic_variables_spaces: dict[str, dict[str, OntologyIndividualSuperclass]],
+    rules: list[RuleRecord],
+    linguistic_variables_spaces: dict[str, list[str]],
     universe: np.ndarray,
 ):
     consequents = {}
 
-    conclusion_variables = set()
-    for rule in rules:
-        conclusions = _get_conclusions(rule)
-        for conclusion in conclusions:
-            left, _ = _get_left_right_hands(conclusion)
-            conclusion_variables.add(left.name)
+    conclusion_variables = {rule.conclusion_variable for rule in rules}
 
     for lv_name, terms in linguistic_variables_spaces.items():
         # Add once and do not add the ultimate goal (never used as a premise)
         if lv_name in conclusion_variables and lv_name not in consequents:
             consequents[lv_name] = ctrl.Consequent(universe, lv_name, defuzzify_method="mom")
-            consequents[lv_name].automf(len(terms), names=terms)
+            add_terms(consequents[lv_name], terms)
     return consequents
 
 
 class ScikitFuzzyWrapper:
     def __init__(
         self,
-        linguistic_variables_spaces: dict[str, dict[str, OntologyIndividualSuperclass]],
+        linguistic_variables_spaces: dict[str, list[str]],
         goal_name: str,
         # TODO: The universe for each variable should be taken from the target system specification
         universe: np.ndarray,
-        rules: list[OntologyIndividualSuperclass],
+        rules: list[RuleRecord],
+        goals: str | Iterable[str] | None = None,
+        tracer: NullTracer = NULL_TRACER,
     ):
+        self.tracer = tracer
+        self.rules = as_rule_records(rules)
+        if goals is not None:
+            self.rules, linguistic_variables_spaces = prune_to_goals(
+                self.rules, linguistic_variables_spaces, goal_names(goals)
+            )
+        self.reasoning_order, self.source_variables = possible_chains(
+            build_rule_graph(self.rules), goal_names(goals if goals is not None else goal_name)
+        )
         self.linguistic_variables_spaces = linguistic_variables_spaces
         self.universe = universe
         self.antecedents = make_antecedents(linguistic_variables_spaces, goal_name, universe)
-        self.consequents = make_consequents(rules, linguistic_variables_spaces, universe)
-        self._make_rules(rules)
-        self.ctrl_system = ctrl.ControlSystem(self.scikit_rules)
-        self.sim = ctrl.ControlSystemSimulation(self.ctrl_system)
-
-    def _make_rules(self, rules: list[OntologyIndividualSuperclass]):
+        self.consequents = make_consequents(self.rules, linguistic_variables_spaces, universe)
+        self._make_rules(self.rules)
+        self.layer_systems = {}
+        # The layer system computing each variable, variables with no rules are in none
+        self.variable_layers = {}
+        for layer in self.reasoning_order:
+            key = frozenset(variable_name(variable) for variable in layer)
+            self.layer_systems[key] = self._make_layer_system(key)
+            for var_name in key:
+                self.variable_layers.setdefault(var_name, key)
+        self.sim = LayeredSimulation()
+        self.goals_inferred = {}
+
+    def _make_rules(self, rules: list[RuleRecord]):
         scikit_rules = []
+        rule_records = []
 
         for rule in rules:
-            premises = _get_premises(rule)
-            conclusions = _get_conclusions(rule)
-
             # Build antecedent conditions (premises)
             antecedent_conditions = None
-            for premise in premises:
-                left, right = _get_left_right_hands(premise)
-                var_name = left.name
-                term_name = right.name
-
+            for var_name, term_name in rule.premises:
                 if var_name in self.antecedents:
                     condition = self.antecedents[var_name][term_name]
                     if antecedent_conditions is None:
@@ -79,43 +105,136 @@ class ScikitFuzzyWrapper:
                         antecedent_conditions = antecedent_conditions & condition
 
             # Build consequent (conclusion)
-            if conclusions:
-                conclusion = conclusions[0]
-                left, right = _get_left_right_hands(conclusion)
-                var_name = left.name
-                term_name = right.name
+            var_name, term_name = rule.conclusion
+            if var_name in self.consequents:
+                consequent = self.consequents[var_name][term_name]
 
-                if var_name in self.consequents:
-                    consequent = self.consequents[var_name][term_name]
-
-                    if antecedent_conditions is not None:
-                        scikit_rules.append(ctrl.Rule(antecedent_conditions, consequent))
+                if antecedent_conditions is not None:
+                    scikit_rules.append(ctrl.Rule(antecedent_conditions, consequent))
+                    rule_records.append(rule)
 
         self.scikit_rules = scikit_rules
+        # The rule each scikit-fuzzy rule was built from, rules without usable premises are left out
+        self.scikit_rule_records = rule_records
+
+    def _make_layer_system(self, var_names: frozenset[str]) -> "LayerSystem | None":
+        records, scikit_rules = [], []
+        for record, scikit_rule in zip(self.scikit_rule_records, self.scikit_rules, strict=True):
+            if record.conclusion_variable in var_names:
+                records.append(record)
+                scikit_rules.append(scikit_rule)
+        return LayerSystem(records, scikit_rules) if scikit_rules else None
+
+    def _layer_systems(self, var_names: list[str]) -> list[tuple["LayerSystem", list[str]]]:
+        """The layer systems computing ``var_names``, each with the names to read back from it.
+
+        A subset of a layer runs the whole layer's system, so callers computing arbitrary subsets, like
+        ``IncrementalInference``, do not add one system per subset. A variable outside the reasoning order gets a
+        system of its own, so there are never more systems than variables.
+        """
+        groups = {}
+        for var_name in var_names:
+            key = self.variable_layers.get(var_name)
+            if key is None:
+                key = self.variable_layers[var_name] = frozenset([var_name])
+                self.layer_systems[key] = self._make_layer_system(key)
+            if self.layer_systems[key] is not None:
+                groups.setdefault(key, []).append(var_name)
+        return [(self.layer_systems[key], names) for key, names in groups.items()]
 
     def set_start_values(
         self,
         input_values: dict[str, float],
     ):
-        for input in self.sim._get_inputs().items():
-            var_name = input[0]
+        for var_name in self.antecedents:
             if var_name in input_values:
                 self.sim.input[var_name] = input_values[var_name]
             else:
-                self.sim.input[var_name] = (self.universe[1] - self.universe[0]) / 2
-
-    def compute(self, layer: set[OntologyIndividualSuperclass]):
-        layer_var_names = [ind.name for ind in layer]
-        print(f"Processing layer with targets: {layer_var_names}")
-
-        # Compute inference for this layer
-        self.sim.compute()
-        print(f" Layer output: {self.sim.output}")
+                self.sim.input[var_name] = self.default_value()
+
+    def default_value(self) -> float:
+        # The middle of the universe, like the other backends, for inputs without a reading
+        return (self.universe.min() + self.universe.max()) / 2
+
+    def compute(self, layer: set):
+        tracer = self.tracer
+        layer_var_names = sorted(variable_name(variable) for variable in layer)
+        with tracer.span("layer", ",".join(layer_var_names)):
+            for layer_system, var_names in self._layer_systems(layer_var_names):
+                # Compute inference for this layer, only its own rules are evaluated
+                sim = layer_system.sim
+                for var_name in layer_system.input_names:
+                    sim.input[var_name] = self.sim.input[var_name]
+                sim.compute()
+                if tracer.enabled:
+                    layer_system.trace_firing_strengths(tracer, var_names)
+
+                # Capture and set output values from this layer
+                for var_name in var_names:
+                    if var_name in sim.output:
+                        output_value = sim.output[var_name]
+                        self.sim.output[var_name] = output_value
+                        self.goals_inferred[var_name] = output_value
+                        if var_name in self.antecedents:
+                            self.sim.input[var_name] = output_value
+                        if tracer.enabled:
+                            tracer.inferred(var_name, float(output_value))
+
+    def compute_batch(
+        self, inputs: dict[str, np.ndarray], reasoning_order: list[set] | None = None
+    ) -> dict[str, np.ndarray]:
+        if reasoning_order is None:
+            reasoning_order = self.reasoning_order
+        values = {var_name: np.atleast_1d(np.asarray(value, dtype=np.float64)) for var_name, value in inputs.items()}
+        samples = max((len(value) for value in values.values()), default=1)
+        values = {
+            var_name: np.broadcast_to(values.get(var_name, self.default_value()), samples).copy()
+            for var_name in self.antecedents
+        }
+
+        outputs = {}
+        for layer in reversed(reasoning_order):
+            layer_var_names = sorted(variable_name(variable) for variable in layer)
+            for layer_system, var_names in self._layer_systems(layer_var_names):
+                # A separate simulation, so array inputs do not disable the result cache of the scalar one. Without
+                # the cache skfuzzy resets the simulation state, inputs included, after every run.
+                sim = ctrl.ControlSystemSimulation(layer_system.ctrl_system, cache=False)
+                for var_name in layer_system.input_names:
+                    sim.input[var_name] = values[var_name]
+                sim.compute()
+                for var_name in var_names:
+                    if var_name in sim.output:
+                        outputs[var_name] = np.asarray(sim.output[var_name], dtype=np.float64)
+                        if var_name in values:
+                            values[var_name] = outputs[var_name]
+        return outputs
+
+
+class LayerSystem:
+    """The control system of one reasoning layer, holding only the rules concluding on its variables."""
+
+    def __init__(self, records: list[RuleRecord], scikit_rules: list[ctrl.Rule]):
+        self.records = records
+        self.scikit_rules = scikit_rules
+        self.ctrl_system = ctrl.ControlSystem(scikit_rules)
+        self.sim = ctrl.ControlSystemSimulation(self.ctrl_system)
+        self.input_names = list(self.sim._get_inputs())
 
-        # Capture and set output values from this layer
+    def trace_firing_strengths(self, tracer: NullTracer, layer_var_names: list[str]):
         for var_name in layer_var_names:
-            if var_name in self.sim.output:
-                output_value = self.sim.output[var_name]
-                print(f" Inferred {var_name} = {output_value}")
-                if var_name in self.antecedents:
-                    self.sim.input[var_name] = output_value
+            tracer.firing_strengths(
+                var_name,
+                {
+                    record.name: float(scikit_rule.aggregate_firing[self.sim])
+                    for record, scikit_rule in zip(self.records, self.scikit_rules, strict=True)
+                    if record.conclusion_variable == var_name
+                },
+            )
+
+
+class LayeredSimulation:
+    """Inputs and outputs of all layers, read and written like those of a single ``ControlSystemSimulation``."""
+
+    def __init__(self):
+        self.input = {}
+        self.output = {}
@@ -0,0 +1,289 @@
+"""Local inference server keeping compiled engines warm, per (ontology, goal, backend).
+
+Requests are JSON objects ``{"ontology": ..., "goal": ..., "backend": ..., "inputs": {...}}``; ``inputs`` may also
+be a list of input objects. They are answered over localhost HTTP (``POST /infer``) or over a Unix domain socket, one
+JSON object per line. Requests arriving together for the same engine are evaluated as one batch.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import queue
+import socketserver
+import stat
+import sys
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+from onto2robot.backends import build_engine
+from onto2robot.cache import compile_rule_base
+from onto2robot.cli import LINGUISTIC_SPACES
+from onto2robot.inference import run_layers
+
+EngineKey = tuple[str, str, str]
+
+
+class Engine:
+    def __init__(self, key: EngineKey, cache_dir: str | None = None):
+        ontology, goal, backend = key
+        rule_base = compile_rule_base(ontology, [goal], cache_dir=cache_dir)
+        spaces = rule_base.linguistic_value_spaces(LINGUISTIC_SPACES)
+        self.reasoning_order, self.source_variables = rule_base.get_possible_chains([goal])
+        self.variables = frozenset(spaces)
+        self.fs = build_engine(backend, spaces, goal, rule_base.rules)
+
+    def check_inputs(self, input_values: dict[str, float]):
+        """Raises ``ValueError`` unless ``input_values`` maps variables of the rule base to numbers."""
+        if not isinstance(input_values, dict):
+            raise ValueError(f"Inputs must be an object of variable values, got {type(input_values).__name__}")
+        for var_name, value in input_values.items():
+            if var_name not in self.variables:
+                raise ValueError(f"Unknown variable {var_name}")
+            if isinstance(value, bool) or not isinstance(value, int | float):
+                raise ValueError(f"Value of {var_name} must be a number, got {type(value).__name__}")
+
+    def infer_batch(self, inputs: list[dict[str, float]]) -> list[dict[str, float]]:
+        if not hasattr(self.fs, "compute_batch"):
+            return [run_layers(self.fs, input_values, self.reasoning_order) for input_values in inputs]
+        # Samples may name different variables, so each batch covers one set of input names
+        groups = {}
+        for i, input_values in enumerate(inputs):
+            groups.setdefault(frozenset(input_values), []).append(i)
+        results = [None] * len(inputs)
+        for names, indices in groups.items():
+            columns = {name: np.array([inputs[i][name] for i in indices], dtype=np.float64) for name in names}
+            outputs = self.fs.compute_batch(columns, self.reasoning_order)
+            for row, i in enumerate(indices):
+                results[i] = {var_name: float(values[row]) for var_name, values in sorted(outputs.items())}
+        return results
+
+
+class Batcher:
+    """Evaluates the requests queued for one engine in batches, on a dedicated thread.
+
+    A batch is flushed when ``max_batch`` samples are waiting or ``max_delay`` seconds after its first request. With
+    no delay, a batch takes whatever queued up while the previous one was evaluated, so batching costs a lone client
+    no latency and grows with the load.
+    """
+
+    def __init__(self, engine: Engine, max_batch: int = 256, max_delay: float = 0.0):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.samples = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, inputs: list[dict[str, float]]) -> Future:
+        future = Future()
+        self._queue.put((inputs, future))
+        return future
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            samples = len(pending[0][0])
+            with contextlib.suppress(queue.Empty):
+                while samples < self.max_batch:
+                    pending.append(self._queue.get(timeout=self.max_delay))
+                    samples += len(pending[-1][0])
+            inputs = [input_values for request_inputs, _ in pending for input_values in request_inputs]
+            try:
+                results = self.engine.infer_batch(inputs)
+            except Exception:
+                # One request spoiled the batch, evaluated alone each fails only its own client
+                for request_inputs, future in pending:
+                    self._evaluate(request_inputs, future)
+                continue
+            self.batches += 1
+            self.samples += len(inputs)
+            start = 0
+            for request_inputs, future in pending:
+                future.set_result(results[start : start + len(request_inputs)])
+                start += len(request_inputs)
+
+    def _evaluate(self, inputs: list[dict[str, float]], future: Future):
+        try:
+            results = self.engine.infer_batch(inputs)
+        except Exception as e:
+            future.set_exception(e)
+            return
+        self.batches += 1
+        self.samples += len(inputs)
+        future.set_result(results)
+
+
+class EnginePool:
+    def __init__(self, cache_dir: str | None = None, max_batch: int = 256, max_delay: float = 0.0):
+        self.cache_dir = cache_dir
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._batchers = {}
+        self._lock = threading.Lock()
+
+    def key(self, ontology: str, goal: str, backend: str) -> EngineKey:
+        return str(Path(ontology).resolve()), goal, backend
+
+    def get(self, ontology: str, goal: str, backend: str) -> Batcher:
+        key = self.key(ontology, goal, backend)
+        with self._lock:
+            # A Future stands in for the engine while it is built, outside the lock, so concurrent first requests
+            # compile the rule base only once and requests to engines already running do not wait for it
+            future = self._batchers.get(key)
+            building = future is None
+            if building:
+                future = self._batchers[key] = Future()
+        if building:
+            try:
+                if not Path(key[0]).is_file():
+                    raise ValueError(f"Ontology {ontology} does not exist")
+                future.set_result(Batcher(Engine(key, self.cache_dir), self.max_batch, self.max_delay))
+            except Exception as e:
+                # Not kept, the next request tries again
+                with self._lock:
+                    del self._batchers[key]
+                future.set_exception(e)
+        return future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            batchers = {key: future.result() for key, future in self._batchers.items() if future.done()}
+        return {
+            "engines": [
+                {"ontology": key[0], "goal": key[1], "backend": key[2], "batches": b.batches, "samples": b.samples}
+                for key, b in batchers.items()
+            ]
+        }
+
+    def handle(self, request: dict) -> dict:
+        try:
+            inputs = request["inputs"]
+            batcher = self.get(request["ontology"], request["goal"], request.get("backend", "numpy"))
+            inputs_list = inputs if isinstance(inputs, list) else [inputs]
+            # Checked here, so a malformed request is refused before it can spoil a batch shared with others
+            for input_values in inputs_list:
+                batcher.engine.check_inputs(input_values)
+            results = batcher.submit(inputs_list).result()
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+        return {"outputs": results if isinstance(inputs, list) else results[0]}
+
+
+class _HTTPHandler(BaseHTTPRequestHandler):
+    pool: EnginePool
+
+    def do_POST(self):
+        if self.path != "/infer":
+            self.send_error(404)
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError as e:
+            self._send_json({"error": f"Invalid JSON: {e}"}, 400)
+            return
+        response = self.pool.handle(request)
+        self._send_json(response, 400 if "error" in response else 200)
+
+    def do_GET(self):
+        if self.path != "/stats":
+            self.send_error(404)
+            return
+        self._send_json(self.pool.stats())
+
+    def _send_json(self, data: dict, status: int = 200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UnixHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.server.pool.stats() if request.get("stats") else self.server.pool.handle(request)
+            except (ValueError, AttributeError) as e:
+                response = {"error": f"Invalid request: {e}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Many robot processes may connect at once, the socketserver default of 5 would refuse them
+    request_queue_size = 128
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def make_http_server(pool: EnginePool, port: int = 8765) -> ThreadingHTTPServer:
+    handler = type("HTTPHandler", (_HTTPHandler,), {"pool": pool})
+    # Only reachable from the same machine
+    return _HTTPServer(("127.0.0.1", port), handler)
+
+
+def make_unix_server(pool: EnginePool, path: str) -> socketserver.UnixStreamServer:
+    if os.path.lexists(path):
+        # A socket left over from an earlier run, anything else is not ours to remove
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise FileExistsError(f"{path} exists and is not a socket")
+        os.unlink(path)
+    server = _UnixServer(path, _UnixHandler)
+    server.pool = pool
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="onto2robot serve", description="Serve inference from warm engines")
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--port", type=int, default=8765, help="Localhost HTTP port")
+    transport.add_argument("--socket", type=str, help="Unix domain socket path, instead of HTTP")
+    parser.add_argument("--cache_dir", type=str, help="Directory for the compiled rule base cache", default=None)
+    parser.add_argument("--max_batch", type=int, default=256, help="Most samples evaluated in one batch")
+    parser.add_argument("--max_delay_ms", type=float, default=0.0, help="How long a batch waits for more requests")
+    parser.add_argument(
+        "--preload",
+        action="append",
+        default=[],
+        metavar="ONTOLOGY:GOAL:BACKEND",
+        help="Build an engine before accepting requests, may be repeated",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    return serve(build_parser().parse_args(argv))
+
+
+def serve(args: argparse.Namespace) -> int:
+    pool = EnginePool(args.cache_dir, args.max_batch, args.max_delay_ms / 1000)
+    for preload in args.preload:
+        ontology, goal, backend = preload.rsplit(":", 2)
+        pool.get(ontology, goal, backend)
+
+    if args.socket:
+        server = make_unix_server(pool, args.socket)
+        print(f"Serving on unix:{args.socket}", file=sys.stderr)
+    else:
+        server = make_http_server(pool, args.port)
+        print(f"Serving on http://127.0.0.1:{server.server_address[1]}", file=sys.stderr)
+    with server, contextlib.suppress(KeyboardInterrupt):
+        server.serve_forever()
+    return 0
@@ -0,0 +1,179 @@
+"""Synthetic rule base ontologies for scale testing, written straight to RDF/XML.
+
+They use the schema of the shipped ontologies: ``RuleHeader`` individuals with ``hasPremise`` and ``hasConclusion``,
+whose ``Premise`` and ``Conclusion`` individuals point with ``hasLeftHand`` to a variable and with ``hasRightHand``
+to a term. The variables form layers: sources, then ``depth - 1`` inner layers and finally the single ``goal``, every
+rule concluding from ``fan_in`` variables of the layer right below. Writing the file directly, instead of creating
+owlready2 individuals one by one, keeps generating a million rules within seconds.
+"""
+
+import argparse
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+
+from onto2robot.rules import RuleRecord
+
+ONTOLOGY_IRI = "http://www.inf.ufrgs.br/phi-group/ontologies/cora.owl"
+GOAL = "goal"
+DEFAULT_TERMS = ["low", "middle", "high"]
+
+HEADER = f"""<?xml version="1.0"?>
+<rdf:RDF xmlns="{ONTOLOGY_IRI}#"
+     xml:base="{ONTOLOGY_IRI}"
+     xmlns:owl="http://www.w3.org/2002/07/owl#"
+     xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+     xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#">
+    <owl:Ontology rdf:about="{ONTOLOGY_IRI}"/>
+    <owl:Class rdf:about="#RuleHeader"/>
+    <owl:Class rdf:about="#Premise"/>
+    <owl:Class rdf:about="#Conclusion"/>
+    <owl:Class rdf:about="#FuzzyVariable"/>
+    <owl:Class rdf:about="#LinguisticTerms"/>
+    <owl:ObjectProperty rdf:about="#hasPremise"/>
+    <owl:ObjectProperty rdf:about="#hasConclusion"/>
+    <owl:ObjectProperty rdf:about="#hasLeftHand"/>
+    <owl:ObjectProperty rdf:about="#hasRightHand"/>
+"""
+FOOTER = "</rdf:RDF>\n"
+
+
+def term_names(terms: int) -> list[str]:
+    return list(DEFAULT_TERMS) if terms == len(DEFAULT_TERMS) else [f"t{i}" for i in range(terms)]
+
+
+def linguistic_spaces(terms: int) -> list[list[str]]:
+    return [term_names(terms)]
+
+
+def variable_layers(variables: int, depth: int) -> list[list[str]]:
+    if depth < 1 or variables < depth + 1:
+        raise ValueError(f"{variables} variables cannot form {depth} layers above the sources")
+    width, extra = divmod(variables - 1, depth)
+    layers = [[f"v{layer}_{i}" for i in range(width + (layer < extra))] for layer in range(depth)]
+    return layers + [[GOAL]]
+
+
+def synthetic_rules(
+    variables: int, terms: int, rules: int, depth: int, fan_in: int = 2, seed: int = 0
+) -> Iterator[RuleRecord]:
+    """``rules`` rules, spread evenly over the inferred variables, with random premise terms."""
+    layers = variable_layers(variables, depth)
+    if fan_in < 1 or fan_in > min(len(layer) for layer in layers[:-1]):
+        raise ValueError(f"A fan-in of {fan_in} needs at least as many variables in every layer")
+    inferred = [(layer, i) for layer in range(1, depth + 1) for i in range(len(layers[layer]))]
+    if rules < len(inferred):
+        raise ValueError(f"{rules} rules cannot conclude on all {len(inferred)} inferred variables")
+    # Validated eagerly, the records themselves are generated lazily
+    return _rule_records(layers, inferred, term_names(terms), rules, fan_in, seed)
+
+
+def _rule_records(
+    layers: list[list[str]], inferred: list[tuple[int, int]], names: list[str], rules: int, fan_in: int, seed: int
+) -> Iterator[RuleRecord]:
+    rng = np.random.default_rng(seed)
+    per_variable, extra = divmod(rules, len(inferred))
+    rule_no = 0
+    for n, (layer, i) in enumerate(inferred):
+        below = layers[layer - 1]
+        variable = layers[layer][i]
+        count = per_variable + (n < extra)
+        premise_terms = rng.integers(len(names), size=(count, fan_in))
+        for j in range(count):
+            # Consecutive rules slide over the layer below, so every variable there feeds some rule
+            start = i + j * fan_in
+            premises = tuple((below[(start + k) % len(below)], names[term]) for k, term in enumerate(premise_terms[j]))
+            yield RuleRecord(f"rule{rule_no}", premises, (variable, names[j % len(names)]))
+            rule_no += 1
+
+
+def _individual(name: str, cls: str, properties: str = "") -> str:
+    return (
+        f"    <owl:NamedIndividual rdf:about={quoteattr('#' + name)}>\n"
+        f'        <rdf:type rdf:resource="#{cls}"/>\n{properties}    </owl:NamedIndividual>\n'
+    )
+
+
+def _property(name: str, individual: str) -> str:
+    return f"        <{name} rdf:resource={quoteattr('#' + individual)}/>\n"
+
+
+def write_synthetic_ontology(
+    path: str | Path,
+    variables: int,
+    terms: int,
+    rules: int,
+    depth: int,
+    fan_in: int = 2,
+    seed: int = 0,
+    chunk_size: int = 10_000,
+) -> dict:
+    """Writes the rule base to ``path`` and describes it.
+
+    Every (variable, term) pair gets a single ``Premise`` and a single ``Conclusion`` individual, shared by all the
+    rules using it, so the file grows with the rules only by their ``RuleHeader``.
+    """
+    records = synthetic_rules(variables, terms, rules, depth, fan_in, seed)
+    premises = set()
+    conclusions = set()
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(HEADER)
+        for layer in variable_layers(variables, depth):
+            file.writelines(_individual(variable, "FuzzyVariable") for variable in layer)
+        file.writelines(_individual(term, "LinguisticTerms") for term in term_names(terms))
+
+        chunk = []
+        written = 0
+        for rule in records:
+            premises.update(rule.premises)
+            conclusions.add(rule.conclusion)
+            properties = [_property("hasPremise", "p_{}_{}".format(*premise)) for premise in rule.premises]
+            properties.append(_property("hasConclusion", "c_{}_{}".format(*rule.conclusion)))
+            chunk.append(_individual(rule.name, "RuleHeader", "".join(properties)))
+            if len(chunk) >= chunk_size:
+                file.write("".join(chunk))
+                written += len(chunk)
+                chunk.clear()
+        file.write("".join(chunk))
+        written += len(chunk)
+
+        for prefix, cls, assignments in (("p", "Premise", premises), ("c", "Conclusion", conclusions)):
+            for variable, term in sorted(assignments):
+                hands = _property("hasLeftHand", variable) + _property("hasRightHand", term)
+                file.write(_individual(f"{prefix}_{variable}_{term}", cls, hands))
+        file.write(FOOTER)
+    return {
+        "path": str(path),
+        "goal": GOAL,
+        "rules": written,
+        "variables": variables,
+        "terms": term_names(terms),
+        "depth": depth,
+        "fan_in": fan_in,
+        "premises": len(premises),
+        "conclusions": len(conclusions),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="onto2robot synthesize", description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=str, help="Ontology file to write", required=True)
+    parser.add_argument("--variables", type=int, default=100, help="Variables over all layers, the goal included")
+    parser.add_argument("--terms", type=int, default=3, help="Terms per linguistic space")
+    parser.add_argument("--rules", type=int, default=10_000)
+    parser.add_argument("--depth", type=int, default=3, help="Layers of inferred variables, the goal's included")
+    parser.add_argument("--fan_in", type=int, default=2, help="Premises per rule")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    try:
+        summary = write_synthetic_ontology(
+            args.output, args.variables, args.terms, args.rules, args.depth, args.fan_in, args.seed
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(json.dumps(summary))
+    return 0
@@ -0,0 +1,137 @@
+"""Tracing hooks for the pipeline stages and the inference layers, replacing progress printed on stdout.
+
+Wrappers and rule bases report to a tracer: spans time the stages (``kind="stage"``) and every computed layer
+(``kind="layer"``), ``firing_strengths`` and ``inferred`` report what each layer did. The default ``NULL_TRACER``
+records nothing, and callers only gather firing strengths or values when ``tracer.enabled`` is set, so tracing costs
+next to nothing while disabled.
+"""
+
+import contextlib
+import io
+import sys
+import time
+from collections.abc import Iterator
+from typing import TextIO
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class NullTracer:
+    enabled = False
+
+    def span(self, kind: str, name: str) -> contextlib.AbstractContextManager:
+        return _NO_SPAN
+
+    def firing_strengths(self, var_name: str, strengths: dict[str, float]) -> None:
+        pass
+
+    def inferred(self, var_name: str, value: float) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class RecordingTracer(NullTracer):
+    """Keeps span count, total and max duration per kind and name, plus the latest firing strengths and inferred
+    value of each variable. The memory used does not grow with the number of spans, so it can trace a whole stream.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        # [count, total, max] per (kind, name)
+        self._durations = {}
+        self.firing = {}
+        self.values = {}
+
+    @contextlib.contextmanager
+    def span(self, kind: str, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, name, time.perf_counter() - start)
+
+    def record(self, kind: str, name: str, duration: float) -> None:
+        durations = self._durations.get((kind, name))
+        if durations is None:
+            self._durations[kind, name] = [1, duration, duration]
+        else:
+            durations[0] += 1
+            durations[1] += duration
+            durations[2] = max(durations[2], duration)
+
+    def firing_strengths(self, var_name: str, strengths: dict[str, float]) -> None:
+        self.firing[var_name] = strengths
+
+    def inferred(self, var_name: str, value: float) -> None:
+        self.values[var_name] = value
+
+    def timings(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Count, total, mean and max duration per span name, grouped by kind."""
+        timings = {}
+        for (kind, name), (count, total, longest) in self._durations.items():
+            timings.setdefault(kind, {})[name] = {"count": count, "total": total, "mean": total / count, "max": longest}
+        return timings
+
+    def summary(self) -> dict:
+        return {"timings": self.timings(), "firing_strengths": self.firing, "inferred": self.values}
+
+
+class PrintTracer(RecordingTracer):
+    """Reports every span with its duration as it ends, and every inferred value, for debugging a single run."""
+
+    def __init__(self, out: TextIO | None = None):
+        super().__init__()
+        self.out = out
+
+    def record(self, kind: str, name: str, duration: float) -> None:
+        super().record(kind, name, duration)
+        print(f"{kind} {name}: {duration * 1000:.3f} ms", file=self.out or sys.stdout)
+
+    def inferred(self, var_name: str, value: float) -> None:
+        super().inferred(var_name, value)
+        print(f"inferred {var_name} = {value}", file=self.out or sys.stdout)
+
+
+class ProfilingTracer(RecordingTracer):
+    """Runs cProfile during one span of each ``sample_every`` of a kind, to profile long runs at a bounded cost."""
+
+    def __init__(self, kind: str = "layer", sample_every: int = 1):
+        import cProfile
+
+        super().__init__()
+        self.kind = kind
+        self.sample_every = sample_every
+        self.profile = cProfile.Profile()
+        self._seen = 0
+        self._profiling = False
+
+    @contextlib.contextmanager
+    def span(self, kind: str, name: str) -> Iterator[None]:
+        sampled = kind == self.kind and not self._profiling and self._seen % self.sample_every == 0
+        if kind == self.kind:
+            self._seen += 1
+        if not sampled:
+            with super().span(kind, name):
+                yield
+            return
+        self._profiling = True
+        self.profile.enable()
+        try:
+            with super().span(kind, name):
+                yield
+        finally:
+            self.profile.disable()
+            self._profiling = False
+
+    def stats(self, sort: str = "cumulative", limit: int = 20) -> str:
+        import pstats
+
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self, path: str) -> None:
+        self.profile.dump_stats(path)
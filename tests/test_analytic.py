@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+import pytest
+
+from onto2robot import analytic
+from onto2robot.backends import build_engine
+from onto2robot.cli import LINGUISTIC_SPACES
+from onto2robot.core import MobileOntologyMeta
+from onto2robot.inference import run_layers
+from onto2robot.membership import automf_points, triangular_membership
+from onto2robot.numpy_wrapper import mean_of_maximum
+
+BOUNDS = np.array([0.0, 40.0])
+
+
+def test_closed_form_defuzzification():
+    points = np.array(automf_points(3, BOUNDS))
+    cuts = np.array([[0.0, 0.5, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.5, 0.0, 0.5]])
+    assert analytic.mean_of_maximum(points, cuts, 0, 40).tolist() == [20, 0, 20, 20]
+    assert np.allclose(analytic.centroid(points, cuts, 0, 40), [20, 20 / 3, 20, 20])
+
+
+@pytest.mark.parametrize("terms", [3, 5])
+def test_closed_form_matches_fine_grid(terms):
+    points = np.array(automf_points(terms, BOUNDS))
+    rng = np.random.default_rng(0)
+    cuts = rng.uniform(0, 1, (200, terms))
+    cuts[rng.uniform(size=cuts.shape) < 0.5] = 0
+    # At least one term fired, so the centroid is defined
+    cuts[:, 0] = np.maximum(cuts[:, 0], 0.1)
+
+    universe = np.linspace(0, 40, 4001)
+    memberships = np.array([triangular_membership(universe, *abc) for abc in points])
+    assert np.allclose(
+        analytic.mean_of_maximum(points, cuts, 0, 40), mean_of_maximum(universe, memberships, cuts), atol=0.02
+    )
+
+    aggregated = np.minimum(cuts[:, :, np.newaxis], memberships).max(axis=1)
+    area = np.trapezoid(aggregated, universe, axis=1)
+    grid_centroid = np.trapezoid(aggregated * universe, universe, axis=1) / area
+    assert np.allclose(analytic.centroid(points, cuts, 0, 40), grid_centroid, atol=0.01)
+
+
+def test_analytic_backend():
+    rule_base = MobileOntologyMeta("tests").rule_base
+    spaces = rule_base.linguistic_value_spaces(LINGUISTIC_SPACES)
+    reasoning_order, _ = rule_base.get_possible_chains(["sFassessment"])
+    fs = build_engine("analytic", spaces, "sFassessment", rule_base.rules)
+
+    inputs = {"sFL": 10.5, "sFR": 25.3}
+    outputs = run_layers(fs, inputs, reasoning_order)
+    batch = fs.compute_batch({var_name: np.array([value]) for var_name, value in inputs.items()})
+    assert math.isclose(outputs["sFassessment"], float(batch["sFassessment"][0]))
+    assert 0 <= outputs["sFassessment"] <= 40
+
+    # Same triangles as the grid-based numpy backend, over [0, 39]
+    numpy = build_engine("numpy", spaces, "sFassessment", rule_base.rules)
+    inputs = {"sFL": 5, "sFR": 30}
+    exact = run_layers(fs, inputs, reasoning_order)["sFassessment"]
+    assert math.isclose(exact, 19.5)
+    assert abs(run_layers(numpy, inputs, reasoning_order)["sFassessment"] - exact) < 0.5
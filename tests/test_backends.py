@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from onto2robot import backends
+from onto2robot.cli import main
+
+
+def test_cli_import_skips_backends():
+    heavy = ("numpy", "networkx", "owlready2", "simpful", "skfuzzy", "scipy")
+    check = (
+        "import sys, onto2robot.cli; "
+        f"loaded = sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r})); "
+        "assert not loaded, loaded"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    subprocess.run([sys.executable, "-c", check], check=True, env=env)
+
+
+def test_backend_registry(monkeypatch):
+    monkeypatch.setattr(backends, "_registered", {})
+    plugin = EntryPoint(name="plugin", value="onto2robot.backends:make_numpy", group=backends.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(backends, "_entry_points", lambda: {"plugin": plugin})
+
+    assert backends.get_backend("numpy") is backends.make_numpy
+    assert backends.get_backend("plugin") is backends.make_numpy
+    assert backends.available_backends() == ["scikit-fuzzy", "simpful", "numpy", "analytic", "plugin"]
+
+    calls = []
+    backends.register_backend("custom", lambda spaces, goal, rules: calls.append(goal) or "engine")
+    assert backends.build_engine("custom", {}, "sFassessment", []) == "engine"
+    assert calls == ["sFassessment"]
+
+    with pytest.raises(ValueError, match="Available: scikit-fuzzy, simpful, numpy, analytic, plugin, custom"):
+        backends.get_backend("missing")
+    with pytest.raises(SystemExit):
+        main(["--input", "x.owl", "--goal", "g", "--fuzzy_model", "missing", "--input_values", "{}"])
@@ -0,0 +1,33 @@
+import shutil
+from pathlib import Path
+
+from onto2robot.cache import cache_file, compile_rule_base, load_cached_rule_base
+from onto2robot.core import MobileOntologyMeta
+
+ONTOLOGIES = Path(__file__).resolve().parents[1] / "ontologies"
+
+
+def test_compiled_rule_base_roundtrip(tmp_path):
+    ontology_path = ONTOLOGIES / "tests.owl"
+    compiled = compile_rule_base(ontology_path, ["sFassessment"], cache_dir=tmp_path)
+    assert cache_file(ontology_path, tmp_path).is_file()
+
+    cached = load_cached_rule_base(cache_file(ontology_path, tmp_path))
+    assert cached.rules == compiled.rules
+    assert cached.linguistic_values == compiled.linguistic_values
+    assert cached.chains == {("sFassessment",): ([{"sFassessment"}], {"sFL", "sFR"})}
+
+    ont = MobileOntologyMeta("tests")
+    assert cached.rules == ont.get_rule_records()
+
+
+def test_cache_is_keyed_by_content(tmp_path):
+    ontology_path = tmp_path / "tests.owl"
+    shutil.copy(ONTOLOGIES / "tests.owl", ontology_path)
+    compile_rule_base(ontology_path, cache_dir=tmp_path / "cache")
+    first_key = cache_file(ontology_path, tmp_path / "cache")
+
+    with open(ontology_path, "a") as f:
+        f.write("\n")
+    assert cache_file(ontology_path, tmp_path / "cache") != first_key
+    assert load_cached_rule_base(cache_file(ontology_path, tmp_path / "cache")) is None
@@ -0,0 +1,54 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from onto2robot.cli import main
+
+ONTOLOGY = str(Path(__file__).resolve().parents[1] / "ontologies" / "tests.owl")
+
+
+@pytest.mark.parametrize("fuzzy_model", ["scikit-fuzzy", "simpful", "numpy"])
+def test_stream_mode(fuzzy_model, tmp_path, monkeypatch, capsys):
+    lines = ['{"sFL": 1, "sFR": 39}', "", "not json", '{"sFL": 39, "sFR": 1}']
+    monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(lines) + "\n"))
+    argv = ["--input", ONTOLOGY, "--goal", "sFassessment", "--fuzzy_model", fuzzy_model, "--stream"]
+    assert main([*argv, "--cache_dir", str(tmp_path)]) == 0
+
+    captured = capsys.readouterr()
+    # Diagnostics go to stderr, so every stdout line is a JSON result
+    results = [json.loads(line) for line in captured.out.splitlines()]
+    assert len(results) == 3
+    assert set(results[0]) == {"sFassessment"}
+    assert "error" in results[1]
+    assert set(results[2]) == {"sFassessment"}
+    assert "Selected ontology" in captured.err
+
+
+def test_stream_mode_missing_input(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"sFL": 1}\n{"sFL": 39, "sFR": 1}\n'))
+    argv = ["--input", ONTOLOGY, "--goal", "sFassessment", "--fuzzy_model", "simpful", "--stream"]
+    assert main([*argv, "--cache_dir", str(tmp_path)]) == 0
+
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(results) == 2
+    assert "sFR" in results[0]["error"]
+    assert set(results[1]) == {"sFassessment"}
+
+
+def test_input_values_required_without_stream():
+    with pytest.raises(SystemExit):
+        main(["--input", ONTOLOGY, "--goal", "sFassessment", "--fuzzy_model", "numpy"])
+
+
+def test_stream_mode_profile_every(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"sFL": 1, "sFR": 39}\n' * 6))
+    profile = tmp_path / "layers.prof"
+    argv = ["--input", ONTOLOGY, "--goal", "sFassessment", "--fuzzy_model", "numpy", "--stream"]
+    assert main([*argv, "--cache_dir", str(tmp_path), "--profile", str(profile), "--profile_every", "3"]) == 0
+
+    assert len(capsys.readouterr().out.splitlines()) == 6
+    assert profile.is_file()
+    with pytest.raises(SystemExit):
+        main([*argv, "--profile", str(profile), "--profile_every", "0"])
@@ -0,0 +1,52 @@
+import importlib.util
+import subprocess
+import sys
+
+import numpy as np
+
+from onto2robot.codegen import generate_controller
+from onto2robot.core import MobileOntologyMeta
+from onto2robot.numpy_wrapper import NumpyFuzzyWrapper
+from onto2robot.rules import RuleRecord
+
+
+def test_generated_controller(tmp_path):
+    ont = MobileOntologyMeta("tests")
+    # A second layer on top of sFassessment, so the chain is compiled too
+    rules = [
+        *ont.get_rule_records(),
+        RuleRecord("M1", (("sFassessment", "low"), ("sRF", "low")), ("move", "high")),
+        RuleRecord("M2", (("sFassessment", "middle"),), ("move", "middle")),
+        RuleRecord("M3", (("sFassessment", "high"), ("sRF", "high")), ("move", "low")),
+    ]
+    spaces = {name: ["low", "middle", "high"] for name in ["sFL", "sFR", "sRF", "sFassessment", "move"]}
+    universe = np.arange(0, 40, 1)
+
+    source = generate_controller(spaces, universe, rules, ["move"], source="tests.owl")
+    module_path = tmp_path / "controller.py"
+    module_path.write_text(source)
+    spec = importlib.util.spec_from_file_location("controller", module_path)
+    controller = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(controller)
+    assert controller.REASONING_ORDER == [["sFassessment"], ["move"]]
+    assert controller.SOURCE_VARIABLES == ["sFL", "sFR", "sRF"]
+
+    rng = np.random.default_rng(0)
+    inputs = {name: rng.uniform(0, 45, 200) for name in controller.SOURCE_VARIABLES}
+    fs = NumpyFuzzyWrapper(spaces, universe, rules, goals=["move"])
+    expected = fs.compute_batch(inputs)
+    outputs = controller.infer_batch(inputs)
+    for name in ["sFassessment", "move"]:
+        assert np.array_equal(outputs[name], expected[name])
+
+    fs.set_start_values({"sFL": 1, "sFR": 39, "sRF": 1})
+    for layer in reversed(fs.reasoning_order):
+        fs.compute(layer)
+    assert controller.infer({"sFL": 1, "sFR": 39, "sRF": 1}) == fs.goals_inferred
+
+    # The controller runs without the ontology toolchain
+    check = (
+        "import sys, controller; controller.infer({'sFL': 1, 'sFR': 2, 'sRF': 3}); "
+        "assert not [m for m in sys.modules if m.split('.')[0] in ('onto2robot', 'owlready2', 'skfuzzy', 'simpful')]"
+    )
+    subprocess.run([sys.executable, "-c", check], cwd=tmp_path, check=True)
@@ -1,5 +1,7 @@
 from math import isclose
 
+import pytest
+from owlready2 import destroy_entity
 from simpful import (
     FuzzySet,
     FuzzySystem,
@@ -19,6 +21,7 @@ from onto2robot.core import (
     rule_to_string,
 )
 from onto2robot.fs_wrapper import SimpfulFuzzyWrapper
+from onto2robot.rules import RuleBase, RuleRecord
 
 
 def test_load_sumo_ontology():
@@ -136,6 +139,32 @@ def test_lingustiic_values():
         assert len(lvals[lv]) == 3
 
 
+def test_rule_records():
+    ont = MobileOntologyMeta("tests")
+    records = ont.get_rule_records()
+    assert len(records) == 9
+    first = records[0]
+    assert first == RuleRecord("R01", (("sFL", "low"), ("sFR", "low")), ("sFassessment", "low"))
+    assert rule_to_string(first) == rule_to_string(ont.get_rules()[0])
+    with pytest.raises(AttributeError):
+        first.name = "R99"
+    assert not hasattr(first, "__dict__")
+
+
+def test_rule_graph():
+    ont = MobileOntologyMeta("tests")
+    sFassessment = ont.ontology.sFassessment
+    graph = ont.rule_graph
+    assert set(graph.predecessors("sFassessment")) == {"sFL", "sFR"}
+    assert len(graph.nodes["sFassessment"]["rules"]) == 9
+    assert ont.get_reachable_variables([sFassessment]) == {sFassessment, ont.ontology.sFL, ont.ontology.sFR}
+    assert ont.get_source_variables([sFassessment]) == {ont.ontology.sFL, ont.ontology.sFR}
+
+    reasoning_order, source_variables = ont.get_possible_chains([sFassessment])
+    assert reasoning_order == [{sFassessment}]
+    assert source_variables == {ont.ontology.sFL, ont.ontology.sFR}
+
+
 def test_backward_chain_tree():
     ont = MobileOntologyMeta("mobile_robot_ontology")
     reasoning_order, source_variables = ont.get_possible_chains([ont.get_individual_by_name("finalMove")])
@@ -351,3 +380,131 @@ def test_full_robot():
     for layer in reversed(reasoning_order):
         fs.compute(layer)
     assert goal in fs.goals_inferred
+
+
+def test_individual_index():
+    ontology = load_ontology("tests")
+    ont = MobileOntologyMeta(ontology)
+    assert ont.get_individual_by_name("sFL") is ontology.sFL
+    assert ont.get_individual_by_name("missing") is None
+    assert len(ont.get_instances_of(ontology.RuleHeader)) == 9
+
+    new_rule = ontology.RuleHeader()
+    new_rule.name = "R99"
+    assert ont.get_individual_by_name("R99") is new_rule
+    assert len(ont.get_instances_of(ontology.RuleHeader)) == 10
+
+    destroy_entity(new_rule)
+    assert ont.get_individual_by_name("R99") is None
+    assert len(ont.get_instances_of(ontology.RuleHeader)) == 9
+
+
+def test_individual_index_rebuilds_only_on_individual_changes(monkeypatch):
+    ontology = load_ontology("tests")
+    ont = MobileOntologyMeta(ontology)
+    rule = ont.get_individual_by_name("R01")
+    rebuilds = []
+    individuals = ontology.individuals
+    monkeypatch.setattr(ontology, "individuals", lambda: rebuilds.append(1) or individuals())
+
+    # Property assignments keep the index
+    rule.hasPremise = list(rule.hasPremise)
+    rule.comment.append("checked")
+    assert ont.get_individual_by_name("R01") is rule
+    assert not rebuilds
+
+    # Created and renamed individuals, as utils/xslxkb.py makes them, are indexed in place
+    rule.name = "R01renamed"
+    assert ont.get_individual_by_name("R01renamed") is rule
+    assert ont.get_individual_by_name("R01") is None
+    for i in range(20):
+        new_rule = ontology.RuleHeader()
+        new_rule.name = f"N{i}"
+        assert ont.get_individual_by_name(f"N{i}") is new_rule
+    assert len(ont.get_instances_of(ontology.RuleHeader)) == 29
+    assert not rebuilds
+
+    destroy_entity(new_rule)
+    assert ont.get_individual_by_name("N19") is None
+    assert len(ont.get_instances_of(ontology.RuleHeader)) == 28
+    assert len(rebuilds) == 1
+
+
+def test_quadstore_backend(tmp_path):
+    quadstore = tmp_path / "quadstore.sqlite3"
+    ont = MobileOntologyMeta("tests", quadstore=quadstore)
+    expected = ont.get_rule_records()
+    ont.destroy()
+
+    reopened = MobileOntologyMeta("tests", quadstore=quadstore)
+    assert reopened.get_rule_records() == expected
+    assert reopened.get_individual_by_name("sFL") is not None
+    reopened.destroy()
+
+
+def test_incremental_rule_updates():
+    ontology = load_ontology("tests")
+    ont = MobileOntologyMeta(ontology)
+    rule_base = ont.rule_base
+    rule_base.linguistic_values  # noqa: B018 - build the derived structures before changing rules
+    graph = ont.rule_graph
+    assert rule_base.get_possible_chains(["sFassessment"]) == ([{"sFassessment"}], {"sFL", "sFR"})
+
+    new_rule = ontology.RuleHeader()
+    new_rule.name = "R10"
+    new_rule.hasPremise = [ontology.premise01]
+    new_rule.hasConclusion = [ontology.Conclusion(hasLeftHand=[ontology.sRF], hasRightHand=[ontology.high])]
+    ont.add_rule(new_rule)
+    assert ont.rule_graph is graph
+    assert set(graph.predecessors("sRF")) == {"sFL"}
+    assert rule_base.linguistic_values["sRF"] == {"high"}
+    assert len(ont.get_rule_records()) == 10
+    assert rule_base.get_possible_chains(["sRF"]) == ([{"sRF"}], {"sFL"})
+
+    ont.remove_rule("R10")
+    assert ont.rule_graph is graph
+    assert "sRF" not in graph
+    assert "sRF" not in rule_base.linguistic_values
+    rebuilt = RuleBase(ont.get_rule_records())
+    assert rule_base.linguistic_values == rebuilt.linguistic_values
+    assert rule_base.get_possible_chains(["sRF"]) == ([], {"sRF"})
+
+
+def test_simpful_goal_pruning():
+    ont = MobileOntologyMeta("tests")
+    extra_rule = RuleRecord("R99", (("sRF", "low"),), ("sRassessment", "high"))
+    spaces = ont.linguistic_value_spaces([["low", "middle", "high"]])
+    spaces.update({"sRF": ["low", "middle", "high"], "sRassessment": ["low", "middle", "high"]})
+
+    fs = SimpfulFuzzyWrapper(spaces, (0, 40), [*ont.get_rule_records(), extra_rule], goals=["sFassessment"])
+    assert extra_rule not in fs.rules
+    assert set(fs.linguistic_variables_spaces) == {"sFL", "sFR", "sFassessment"}
+    fs.set_start_values({"sFL": 5, "sFR": 30})
+    fs.compute({"sFassessment"})
+    assert "sFassessment" in fs.goals_inferred
+
+
+def test_simpful_parallel_batch():
+    ont = MobileOntologyMeta("tests")
+    spaces = ont.linguistic_value_spaces([["low", "middle", "high"]])
+    fs = SimpfulFuzzyWrapper(spaces, (0, 40), ont.get_rule_records(), goals=["sFassessment"])
+    assert fs.reasoning_order == [{"sFassessment"}]
+    inputs = {"sFL": [1, 5, 20, 39, 12.5, 30], "sFR": [1, 30, 20, 1, 33.3, 8]}
+
+    serial = fs.compute_batch(inputs)
+    parallel = fs.compute_batch(inputs, workers=2, shards_per_worker=2)
+    assert list(parallel["sFassessment"]) == list(serial["sFassessment"])
+    fs.set_start_values({"sFL": 39, "sFR": 1})
+    fs.compute({"sFassessment"})
+    assert isclose(serial["sFassessment"][3], fs.goals_inferred["sFassessment"])
+
+
+def test_simpful_empty_batch():
+    ont = MobileOntologyMeta("tests")
+    spaces = ont.linguistic_value_spaces([["low", "middle", "high"]])
+    fs = SimpfulFuzzyWrapper(spaces, (0, 40), ont.get_rule_records(), goals=["sFassessment"])
+    for inputs in [{}, {"sFL": [], "sFR": []}]:
+        for workers in [1, 2]:
+            outputs = fs.compute_batch(inputs, workers=workers)
+            assert list(outputs) == ["sFassessment"]
+            assert outputs["sFassessment"].shape == (0,)
@@ -0,0 +1,66 @@
+import math
+
+import numpy as np
+import pytest
+
+from onto2robot.backends import build_engine
+from onto2robot.inference import IncrementalInference, run_layers
+from onto2robot.rules import RuleBase, RuleRecord
+
+TERMS = ["low", "middle", "high"]
+# Two independent sensor branches joined by the goal
+RULES = [
+    *(RuleRecord(f"A{i}", (("a", term),), ("x", term)) for i, term in enumerate(TERMS)),
+    *(RuleRecord(f"B{i}", (("b", term),), ("y", TERMS[2 - i])) for i, term in enumerate(TERMS)),
+    *(RuleRecord(f"G{i}", (("x", term), ("y", term)), ("goal", term)) for i, term in enumerate(TERMS)),
+]
+
+
+@pytest.mark.parametrize("fuzzy_model", ["scikit-fuzzy", "simpful", "numpy"])
+def test_incremental_inference(fuzzy_model):
+    spaces = {variable: TERMS for variable in ["a", "b", "x", "y", "goal"]}
+    reasoning_order, _ = RuleBase(RULES).get_possible_chains(["goal"])
+    fs = build_engine(fuzzy_model, spaces, "goal", RULES)
+    reference = build_engine(fuzzy_model, spaces, "goal", RULES)
+    incremental = IncrementalInference(fs, reasoning_order)
+
+    rng = np.random.default_rng(0)
+    inputs = {"a": 10.0, "b": 30.0}
+    assert incremental.infer(inputs).keys() == {"x", "y", "goal"}
+    for _ in range(5):
+        inputs["a"] = float(rng.uniform(0, 39))
+        recomputed = incremental.recomputed
+        outputs = incremental.infer({"a": inputs["a"]})
+        # y only depends on b, so it is reused
+        assert incremental.recomputed - recomputed <= 2
+        expected = run_layers(reference, inputs, reasoning_order)
+        for var_name, value in expected.items():
+            assert math.isclose(outputs[var_name], value, abs_tol=1e-9)
+
+    recomputed = incremental.recomputed
+    incremental.infer({"a": inputs["a"]})
+    assert incremental.recomputed == recomputed
+
+
+def test_incremental_inference_recovers_from_failed_layer():
+    spaces = {variable: TERMS for variable in ["a", "b", "x", "y", "goal"]}
+    reasoning_order, _ = RuleBase(RULES).get_possible_chains(["goal"])
+    fs = build_engine("numpy", spaces, "goal", RULES)
+    reference = build_engine("numpy", spaces, "goal", RULES)
+    incremental = IncrementalInference(fs, reasoning_order)
+    incremental.infer({"a": 10.0, "b": 5.0})
+
+    compute = fs.compute
+
+    def failing_compute(layer):
+        fs.compute = compute
+        raise RuntimeError("sensor glitch")
+
+    # The goal layer fails after x was recomputed for the new reading
+    fs.compute = lambda layer: compute(layer) if "goal" not in layer else failing_compute(layer)
+    with pytest.raises(RuntimeError):
+        incremental.infer({"a": 35.0})
+    # The same reading again is still a change, and the goal catches up with it
+    outputs = incremental.infer({"a": 35.0})
+    expected = run_layers(reference, {"a": 35.0, "b": 5.0}, reasoning_order)
+    assert math.isclose(outputs["goal"], expected["goal"], abs_tol=1e-9)
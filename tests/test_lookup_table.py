@@ -0,0 +1,52 @@
+import math
+
+import numpy as np
+import pytest
+
+from onto2robot.core import MobileOntologyMeta
+from onto2robot.lookup_table import LookupTable, compile_lookup_table, interpolation_error
+from onto2robot.numpy_wrapper import NumpyFuzzyWrapper
+from onto2robot.scikit_fuzz_wrapper import ScikitFuzzyWrapper
+
+
+def test_multilinear_interpolation():
+    axes = [np.linspace(0, 10, 6), np.linspace(0, 10, 11), np.linspace(0, 10, 3)]
+    grid = np.meshgrid(*axes, indexing="ij")
+    tables = {"linear": 2 * grid[0] - grid[1] + 0.5 * grid[2], "product": grid[0] * grid[1]}
+    table = LookupTable(["a", "b", "c"], axes, tables)
+
+    rng = np.random.default_rng(0)
+    a, b, c = rng.uniform(0, 10, (3, 50))
+    outputs = table.compute_batch({"a": a, "b": b, "c": c})
+    # Multilinear interpolation is exact for functions linear in each variable
+    assert np.allclose(outputs["linear"], 2 * a - b + 0.5 * c)
+    assert np.allclose(outputs["product"], a * b)
+    # Values outside the grid are clipped to it
+    assert math.isclose(table.compute({"a": -5, "b": 20, "c": 0})["product"], 0)
+    assert table.nbytes == sum(axis.nbytes for axis in axes) + 2 * 6 * 11 * 3 * 8
+
+
+def test_compile_lookup_table():
+    ont = MobileOntologyMeta("tests")
+    rules = ont.get_rule_records()
+    spaces = ont.linguistic_value_spaces([["low", "middle", "high"]])
+    universe = np.arange(0, 40, 1)
+    engine = NumpyFuzzyWrapper(spaces, universe, rules, goals="sFassessment")
+    reasoning_order, sources = ont.rule_base.get_possible_chains(["sFassessment"])
+
+    table = compile_lookup_table(engine, sources, reasoning_order, resolution=14, bounds=(0, 39))
+    assert table.source_variables == ["sFL", "sFR"]
+    assert table.tables["sFassessment"].shape == (14, 14)
+    # Grid nodes reproduce the sampled engine exactly
+    node = {"sFL": table.axes[0][3], "sFR": table.axes[1][9]}
+    engine.set_start_values(node)
+    engine.compute({"sFassessment"})
+    assert math.isclose(table.compute(node)["sFassessment"], engine.goals_inferred["sFassessment"])
+
+    scikit = ScikitFuzzyWrapper(spaces, "sFassessment", universe, rules)
+    errors = interpolation_error(table, scikit, reasoning_order, samples=50)
+    assert set(errors) == {"sFassessment"}
+    assert 0 <= errors["sFassessment"] < 39
+
+    with pytest.raises(ValueError):
+        compile_lookup_table(engine, sources, reasoning_order, resolution=14, bounds=(0, 39), max_cells=100)
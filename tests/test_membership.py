@@ -0,0 +1,54 @@
+import math
+
+import numpy as np
+import pytest
+
+from onto2robot.analytic import AnalyticFuzzyWrapper
+from onto2robot.backends import build_engine
+from onto2robot.inference import run_layers
+from onto2robot.membership import MembershipBank
+from onto2robot.rules import RuleRecord
+
+TERMS = ["t0", "t1", "t2", "t3", "t4"]
+RULES = [
+    *(RuleRecord(f"A{i}", (("a", term),), ("x", term)) for i, term in enumerate(TERMS)),
+    *(RuleRecord(f"G{i}", (("x", term), ("b", term)), ("goal", TERMS[-1 - i])) for i, term in enumerate(TERMS)),
+]
+SPACES = {variable: TERMS for variable in ["a", "b", "x", "goal"]}
+
+
+def test_membership_bank_shares_spaces():
+    bank = MembershipBank()
+    universe = np.arange(0, 40, 1)
+    memberships = bank.memberships(5, universe)
+    assert bank.memberships(5, np.arange(0, 40, 1)) is memberships
+    assert bank.memberships(3, universe) is not memberships
+    assert memberships.shape == (5, 40)
+    assert not memberships.flags.writeable
+    assert bank.stats()["membership_arrays"] == 2
+    assert bank.simpful_points(5, 0, 40) is bank.points(5, 0, 40)
+    assert bank.simpful_points(3, 0, 40).tolist() == [[0, 0, 40 / 3], [0, 40 / 3, 40], [40 / 3, 40, 40]]
+    with pytest.raises(ValueError, match="at least 2 terms"):
+        bank.points(1, 0, 40)
+
+
+@pytest.mark.parametrize("fuzzy_model", ["scikit-fuzzy", "numpy"])
+def test_wrappers_share_memberships(fuzzy_model):
+    fs = build_engine(fuzzy_model, SPACES, "goal", RULES)
+    if fuzzy_model == "numpy":
+        arrays = [fs.memberships[var_name] for var_name in ["a", "b", "x", "goal"]]
+    else:
+        variables = [fs.antecedents["a"], fs.antecedents["b"], fs.consequents["x"], fs.consequents["goal"]]
+        arrays = [variable["t2"].mf for variable in variables]
+    assert all(np.shares_memory(array, arrays[0]) for array in arrays)
+
+
+def test_simpful_n_terms():
+    reasoning_order = [{"goal"}, {"x"}]
+    simpful = build_engine("simpful", SPACES, "goal", RULES)
+    exact = AnalyticFuzzyWrapper(SPACES, (0, 40), RULES, goals=["goal"], defuzzify_method="centroid")
+    for inputs in [{"a": 5, "b": 5}, {"a": 17.5, "b": 20}]:
+        expected = run_layers(exact, inputs, reasoning_order)
+        for var_name, value in run_layers(simpful, inputs, reasoning_order).items():
+            # simpful samples the universe for the centroid
+            assert math.isclose(value, expected[var_name], abs_tol=0.05)
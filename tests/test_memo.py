@@ -0,0 +1,69 @@
+import math
+
+import pytest
+
+from onto2robot.backends import build_engine
+from onto2robot.cli import LINGUISTIC_SPACES
+from onto2robot.core import MobileOntologyMeta
+from onto2robot.inference import run_layers
+from onto2robot.memo import MemoizedEngine
+
+
+def _engine(fuzzy_model: str):
+    rule_base = MobileOntologyMeta("tests").rule_base
+    spaces = rule_base.linguistic_value_spaces(LINGUISTIC_SPACES)
+    reasoning_order, _ = rule_base.get_possible_chains(["sFassessment"])
+    return build_engine(fuzzy_model, spaces, "sFassessment", rule_base.rules), reasoning_order
+
+
+@pytest.mark.parametrize("fuzzy_model", ["scikit-fuzzy", "simpful", "numpy"])
+def test_memoized_engine(fuzzy_model):
+    fs, reasoning_order = _engine(fuzzy_model)
+    memo = MemoizedEngine(fs, step=0.5)
+
+    first = run_layers(memo, {"sFL": 10.1, "sFR": 24.9}, reasoning_order)
+    # Same cell of the quantization grid
+    second = run_layers(memo, {"sFL": 9.9, "sFR": 25.2}, reasoning_order)
+    third = run_layers(memo, {"sFL": 30, "sFR": 5}, reasoning_order)
+    assert first == second
+    assert memo.stats()["hits"] == 1
+    assert memo.stats()["misses"] == 2
+
+    # The engine ran on the cell centres
+    assert math.isclose(first["sFassessment"], run_layers(fs, {"sFL": 10, "sFR": 25}, reasoning_order)["sFassessment"])
+    assert math.isclose(third["sFassessment"], run_layers(fs, {"sFL": 30, "sFR": 5}, reasoning_order)["sFassessment"])
+
+
+def test_memoized_engine_evicts_least_recently_used():
+    fs, reasoning_order = _engine("numpy")
+    memo = MemoizedEngine(fs, step=1, max_size=2)
+    for values in [{"sFL": 1, "sFR": 1}, {"sFL": 2, "sFR": 2}, {"sFL": 1, "sFR": 1}, {"sFL": 3, "sFR": 3}]:
+        run_layers(memo, values, reasoning_order)
+    assert memo.stats()["size"] == 2
+
+    run_layers(memo, {"sFL": 1, "sFR": 1}, reasoning_order)
+    assert memo.hits == 2
+    run_layers(memo, {"sFL": 2, "sFR": 2}, reasoning_order)
+    assert memo.misses == 4
+
+
+def test_memoized_engine_skips_failed_compute():
+    fs, reasoning_order = _engine("numpy")
+    compute = fs.compute
+
+    def failing_compute(layer):
+        fs.compute = compute
+        raise RuntimeError("sensor glitch")
+
+    fs.compute = failing_compute
+    memo = MemoizedEngine(fs, step=1)
+    with pytest.raises(RuntimeError):
+        run_layers(memo, {"sFL": 10, "sFR": 25}, reasoning_order)
+    assert memo.stats()["size"] == 0
+
+    # The same key is computed again, not served from a partly filled entry
+    outputs = run_layers(memo, {"sFL": 10, "sFR": 25}, reasoning_order)
+    assert memo.hits == 0
+    assert outputs == run_layers(fs, {"sFL": 10, "sFR": 25}, reasoning_order)
+    assert run_layers(memo, {"sFL": 10, "sFR": 25}, reasoning_order) == outputs
+    assert memo.hits == 1
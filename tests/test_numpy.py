@@ -0,0 +1,77 @@
+import math
+from itertools import product
+
+import numpy as np
+
+from onto2robot.core import MobileOntologyMeta
+from onto2robot.inference import run_layers
+from onto2robot.numpy_wrapper import SPARSE_MIN_RULES, NumpyFuzzyWrapper, mean_of_maximum
+from onto2robot.rules import RuleRecord
+from onto2robot.scikit_fuzz_wrapper import ScikitFuzzyWrapper
+
+
+def test_mean_of_maximum_plateau():
+    universe = np.arange(0, 5, 1.0)
+    memberships = np.array([[0, 0, 0.5, 1, 0.5]])
+    # Clipped at 0.75 the plateau spans 2.5..3.5, between the grid points
+    assert math.isclose(mean_of_maximum(universe, memberships, np.array([[0.75]]))[0], 3)
+    assert math.isclose(mean_of_maximum(universe, memberships, np.array([[1.0]]))[0], 3)
+
+
+def test_numpy_matches_scikit():
+    ont = MobileOntologyMeta("tests")
+    rules = ont.get_rule_records()
+    spaces = ont.linguistic_value_spaces([["low", "middle", "high"]])
+    universe = np.arange(0, 40, 1)
+    scikit = ScikitFuzzyWrapper(spaces, "sFassessment", universe, rules)
+    fs = NumpyFuzzyWrapper(spaces, universe, rules, goals="sFassessment")
+    assert fs.reasoning_order == [{"sFassessment"}]
+
+    rng = np.random.default_rng(0)
+    samples = np.concatenate([rng.uniform(0, 45, size=(100, 2)), [[1, 39], [20, 20], [39, 1], [0, 0]]])
+    batch = fs.compute_batch({"sFL": samples[:, 0], "sFR": samples[:, 1]})
+    for i, (s_fl, s_fr) in enumerate(samples):
+        scikit.set_start_values({"sFL": s_fl, "sFR": s_fr})
+        scikit.compute({"sFassessment"})
+        fs.set_start_values({"sFL": s_fl, "sFR": s_fr})
+        fs.compute({"sFassessment"})
+        assert math.isclose(fs.goals_inferred["sFassessment"], scikit.sim.output["sFassessment"], abs_tol=1e-9)
+        assert math.isclose(batch["sFassessment"][i], fs.goals_inferred["sFassessment"])
+
+    # Inputs without a reading default to the same value in both
+    assert fs.default_value() == scikit.default_value() == 19.5
+    scikit.set_start_values({"sFL": 5})
+    scikit.compute({"sFassessment"})
+    fs.set_start_values({"sFL": 5})
+    fs.compute({"sFassessment"})
+    assert math.isclose(fs.goals_inferred["sFassessment"], scikit.sim.output["sFassessment"], abs_tol=1e-9)
+
+
+def test_sparse_rule_activation():
+    terms = ["t0", "t1", "t2", "t3", "t4"]
+    sources = ["a", "b", "c", "d"]
+    # Every combination of terms, more rules than the sparse index threshold
+    rules = [
+        RuleRecord(f"R{n}", tuple(zip(sources, combination, strict=True)), ("goal", terms[n % len(terms)]))
+        for n, combination in enumerate(product(terms, repeat=len(sources)))
+    ]
+    assert len(rules) >= SPARSE_MIN_RULES
+    spaces = {variable: terms for variable in [*sources, "goal"]}
+    universe = np.arange(0, 40, 1)
+    sparse = NumpyFuzzyWrapper(spaces, universe, rules, goals="goal")
+    dense = NumpyFuzzyWrapper(spaces, universe, rules, goals="goal", sparse=False)
+
+    rng = np.random.default_rng(0)
+    inputs = {variable: rng.uniform(0, 39, 50) for variable in sources}
+    assert np.array_equal(sparse.compute_batch(inputs)["goal"], dense.compute_batch(inputs)["goal"])
+    for i in range(20):
+        values = {variable: float(value[i]) for variable, value in inputs.items()}
+        assert run_layers(sparse, values, sparse.reasoning_order) == run_layers(dense, values, dense.reasoning_order)
+
+    stats = sparse.activation_stats()
+    assert stats["ticks"] == 20
+    assert stats["rules_per_tick"] == len(rules)
+    # Only a few of the terms of each input have nonzero membership
+    assert stats["fired_per_tick"] <= stats["evaluated_per_tick"] <= 3 ** len(sources)
+    assert dense.activation_stats()["evaluated_per_tick"] == len(rules)
+    assert dense.activation_stats()["fired_per_tick"] == stats["fired_per_tick"]
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import numpy as np
+
+from onto2robot.core import MobileOntologyMeta
+from onto2robot.numpy_wrapper import NumpyFuzzyWrapper
+from onto2robot.runner import ControlLoop, FunctionSink, FunctionSource, LatestValueSource
+
+
+class SlowEngine:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.goals_inferred = {}
+
+    def set_start_values(self, input_values: dict[str, float]):
+        self.input_values = input_values
+
+    def compute(self, layer: set):
+        # Blocking, like a real inference
+        time.sleep(self.delay)
+        self.goals_inferred["out"] = self.input_values["x"] * 2
+
+
+def test_control_loop():
+    ont = MobileOntologyMeta("tests")
+    spaces = ont.linguistic_value_spaces([["low", "middle", "high"]])
+    fs = NumpyFuzzyWrapper(spaces, np.arange(0, 40, 1), ont.get_rule_records(), goals="sFassessment")
+    sensors = LatestValueSource({"sFR": 30})
+    readings = iter(range(100))
+    outputs = []
+
+    async def read_sFL():
+        return {"sFL": float(next(readings))}
+
+    loop = ControlLoop(
+        fs, fs.reasoning_order, [FunctionSource(read_sFL), sensors], [FunctionSink(outputs.append)], 0.01
+    )
+    stats = asyncio.run(loop.run(ticks=10))
+
+    assert stats.ticks == 10
+    assert len(outputs) == 10
+    assert all(set(output) == {"sFassessment"} for output in outputs)
+    summary = stats.summary()
+    assert summary["jitter"]["max"] >= 0
+    assert summary["inference_duration"]["mean"] < 0.01
+
+
+def test_slow_inference_does_not_block_event_loop():
+    outputs = []
+    loop = ControlLoop(
+        SlowEngine(0.03), [{"out"}], [FunctionSource(lambda: {"x": 2})], [FunctionSink(outputs.append)], 0.01
+    )
+
+    async def main():
+        heartbeats = 0
+
+        async def heartbeat():
+            nonlocal heartbeats
+            while True:
+                await asyncio.sleep(0.002)
+                heartbeats += 1
+
+        task = asyncio.create_task(heartbeat())
+        stats = await loop.run(ticks=4)
+        task.cancel()
+        return stats, heartbeats
+
+    stats, heartbeats = asyncio.run(main())
+    assert outputs == [{"out": 4}] * 4
+    assert stats.deadline_misses == 4
+    assert stats.skipped_ticks >= 4
+    # About 120 ms of blocking inference ran in the executor while the loop kept scheduling other tasks
+    assert heartbeats > 20
@@ -3,7 +3,10 @@ import math
 import numpy as np
 
 from onto2robot.core import MobileOntologyMeta
+from onto2robot.inference import IncrementalInference, run_layers
+from onto2robot.rules import RuleBase, RuleRecord
 from onto2robot.scikit_fuzz_wrapper import ScikitFuzzyWrapper
+from onto2robot.synthetic import synthetic_rules
 
 
 def scikit_fuzzy_full(input_values: dict[str, float]):
@@ -301,3 +304,87 @@ def test_scikit_fuzzy_13():
     assert math.isclose(results.get("sRassessment"), 1, abs_tol=1)
     assert math.isclose(results.get("move"), 39, abs_tol=1)
     assert math.isclose(results.get("finalMove"), 40, abs_tol=1.0)
+
+
+def test_scikit_goal_pruning():
+    ont = MobileOntologyMeta("tests")
+    extra_rule = RuleRecord("R99", (("sRF", "low"),), ("sRassessment", "high"))
+    rules = [*ont.get_rule_records(), extra_rule]
+    spaces = ont.linguistic_value_spaces([["low", "middle", "high"]])
+    spaces.update({"sRF": ["low", "middle", "high"], "sRassessment": ["low", "middle", "high"]})
+    universe = np.arange(0, 40, 1)
+
+    full = ScikitFuzzyWrapper(spaces, "sFassessment", universe, rules)
+    pruned = ScikitFuzzyWrapper(spaces, "sFassessment", universe, rules, goals="sFassessment")
+    assert extra_rule not in pruned.rules
+    assert "sRF" not in pruned.antecedents
+    assert "sRassessment" not in pruned.consequents
+    assert len(pruned.scikit_rules) == 9
+
+    for fs in (full, pruned):
+        fs.set_start_values({"sFL": 5, "sFR": 30, "sRF": 1})
+        fs.compute({"sFassessment"})
+    assert math.isclose(full.sim.output["sFassessment"], pruned.sim.output["sFassessment"])
+
+
+def test_scikit_compute_batch():
+    ont = MobileOntologyMeta("tests")
+    rules = ont.get_rule_records()
+    spaces = ont.linguistic_value_spaces([["low", "middle", "high"]])
+    fs = ScikitFuzzyWrapper(spaces, "sFassessment", np.arange(0, 40, 1), rules)
+    assert fs.reasoning_order == [{"sFassessment"}]
+    assert fs.source_variables == {"sFL", "sFR"}
+
+    s_fl = np.array([1, 5, 20, 39, 12.5])
+    s_fr = np.array([1, 30, 20, 1, 33.3])
+    outputs = fs.compute_batch({"sFL": s_fl, "sFR": s_fr})
+    assert outputs["sFassessment"].shape == (5,)
+    for i in range(len(s_fl)):
+        fs.set_start_values({"sFL": s_fl[i], "sFR": s_fr[i]})
+        fs.compute({"sFassessment"})
+        assert math.isclose(outputs["sFassessment"][i], fs.sim.output["sFassessment"])
+
+    # Scalars are broadcast against the array inputs
+    broadcast = fs.compute_batch({"sFL": 5, "sFR": s_fr})
+    assert math.isclose(broadcast["sFassessment"][1], outputs["sFassessment"][1])
+
+
+def test_scikit_layer_systems():
+    rules = list(synthetic_rules(variables=10, terms=3, rules=45, depth=3))
+    spaces = {variable: ["low", "middle", "high"] for variable in RuleBase(rules).linguistic_values}
+    fs = ScikitFuzzyWrapper(spaces, "goal", np.arange(0, 40, 1), rules, goals="goal")
+
+    # Every rule belongs to the sub-system of exactly one layer
+    assert len(fs.layer_systems) == len(fs.reasoning_order) == 3
+    layer_rules = [record.name for system in fs.layer_systems.values() for record in system.records]
+    assert sorted(layer_rules) == sorted(rule.name for rule in fs.scikit_rule_records)
+
+    rng = np.random.default_rng(0)
+    inputs = {variable: rng.uniform(0, 39, 5) for variable in fs.source_variables}
+    outputs = fs.compute_batch(inputs)
+    for i in range(5):
+        fs.set_start_values({variable: values[i] for variable, values in inputs.items()})
+        for layer in reversed(fs.reasoning_order):
+            fs.compute(layer)
+        assert math.isclose(fs.sim.output["goal"], outputs["goal"][i])
+        assert fs.sim.output.keys() == outputs.keys()
+
+
+def test_scikit_layer_subsets():
+    rules = list(synthetic_rules(variables=13, terms=3, rules=9, depth=3))
+    spaces = {variable: ["low", "middle", "high"] for variable in RuleBase(rules).linguistic_values}
+    fs = ScikitFuzzyWrapper(spaces, "goal", np.arange(0, 40, 1), rules, goals="goal")
+    full = ScikitFuzzyWrapper(spaces, "goal", np.arange(0, 40, 1), rules, goals="goal")
+    systems = dict(fs.layer_systems)
+
+    # Each source change leaves a different subset of the layers dirty, all computed by the layers' own systems
+    incremental = IncrementalInference(fs, fs.reasoning_order)
+    rng = np.random.default_rng(0)
+    input_values = {variable: 20.0 for variable in sorted(fs.source_variables)}
+    incremental.infer(input_values)
+    for variable in [*sorted(fs.source_variables)] * 2:
+        input_values[variable] = float(rng.uniform(0, 39))
+        outputs = incremental.infer({variable: input_values[variable]})
+        assert math.isclose(outputs["goal"], run_layers(full, input_values, full.reasoning_order)["goal"])
+    assert incremental.reused > 0
+    assert fs.layer_systems == systems
@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from onto2robot import server as server_module
+from onto2robot.client import InferenceClient, InferenceError
+from onto2robot.server import Batcher, EnginePool, make_http_server, make_unix_server
+
+ONTOLOGY = str(Path(__file__).resolve().parents[1] / "ontologies" / "tests.owl")
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return EnginePool(cache_dir=str(tmp_path / "cache"), max_delay=0.05)
+
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_http_server(pool):
+    with serve(make_http_server(pool, port=0)) as server:
+        address = f"http://127.0.0.1:{server.server_address[1]}"
+        with InferenceClient(address, ONTOLOGY, "sFassessment", "scikit-fuzzy") as client:
+            single = client.infer({"sFL": 1, "sFR": 39})
+            batch = client.infer_batch([{"sFL": 1, "sFR": 39}, {"sFL": 39, "sFR": 1}])
+        assert set(single) == {"sFassessment"}
+        assert batch[0] == single
+        assert len(batch) == 2
+
+        with pytest.raises(InferenceError):
+            InferenceClient(address, ONTOLOGY, "sFassessment", "no-such-backend").infer({"sFL": 1})
+        server.shutdown()
+
+
+def test_unix_server_batches_concurrent_requests(pool, tmp_path):
+    socket_path = str(tmp_path / "onto2robot.sock")
+    with serve(make_unix_server(pool, socket_path)) as server:
+        address = f"unix:{socket_path}"
+        with InferenceClient(address, ONTOLOGY, "sFassessment") as client:
+            expected = client.infer({"sFL": 5, "sFR": 30})
+
+        def infer(value):
+            with InferenceClient(address, ONTOLOGY, "sFassessment") as client:
+                return client.infer({"sFL": 5, "sFR": value})
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(infer, [30] * 16))
+        assert all(result == expected for result in results)
+
+        # One engine served every request, in fewer batches than requests
+        (engine,) = pool.stats()["engines"]
+        assert engine["samples"] == 17
+        assert engine["batches"] < 17
+        server.shutdown()
+
+
+def test_engine_pool_builds_outside_lock(pool, monkeypatch):
+    ready = pool.get(ONTOLOGY, "sFassessment", "numpy")
+    building, release = threading.Event(), threading.Event()
+    engine_class = server_module.Engine
+
+    def slow_engine(key, cache_dir=None):
+        building.set()
+        release.wait(5)
+        return engine_class(key, cache_dir)
+
+    monkeypatch.setattr(server_module, "Engine", slow_engine)
+    with ThreadPoolExecutor(2) as executor:
+        slow = executor.submit(pool.get, ONTOLOGY, "sFassessment", "scikit-fuzzy")
+        assert building.wait(5)
+        # The engine already running is served while the other one is built
+        assert pool.get(ONTOLOGY, "sFassessment", "numpy") is ready
+        waiting = executor.submit(pool.get, ONTOLOGY, "sFassessment", "scikit-fuzzy")
+        release.set()
+        assert slow.result() is waiting.result()
+
+    with pytest.raises(ValueError, match="does not exist"):
+        pool.get("missing.owl", "sFassessment", "numpy")
+    assert len(pool.stats()["engines"]) == 2
+
+
+def test_bad_request_fails_alone(tmp_path):
+    pool = EnginePool(cache_dir=str(tmp_path / "cache"), max_delay=0.2)
+    pool.get(ONTOLOGY, "sFassessment", "numpy")
+    request = {"ontology": ONTOLOGY, "goal": "sFassessment", "backend": "numpy"}
+    with ThreadPoolExecutor(4) as executor:
+        responses = list(
+            executor.map(
+                pool.handle,
+                [
+                    {**request, "inputs": {"sFL": 5, "sFR": 30}},
+                    {**request, "inputs": {"sFL": "bad"}},
+                    {**request, "inputs": 7},
+                    {**request, "inputs": {"nope": 1}},
+                ],
+            )
+        )
+    assert set(responses[0]["outputs"]) == {"sFassessment"}
+    assert all(response["error"].startswith("ValueError") for response in responses[1:])
+
+
+def test_batcher_isolates_failing_request():
+    class Engine:
+        def infer_batch(self, inputs):
+            if any(input_values.get("fail") for input_values in inputs):
+                raise RuntimeError("cannot infer")
+            return [{"goal": input_values["x"]} for input_values in inputs]
+
+    batcher = Batcher(Engine(), max_delay=0.2)
+    good, bad = batcher.submit([{"x": 1.0}]), batcher.submit([{"x": 2.0, "fail": 1}])
+    assert good.result(5) == [{"goal": 1.0}]
+    with pytest.raises(RuntimeError, match="cannot infer"):
+        bad.result(5)
+
+
+def test_unix_server_keeps_other_files(pool, tmp_path):
+    path = tmp_path / "not-a-socket"
+    path.write_text("keep me")
+    with pytest.raises(FileExistsError):
+        make_unix_server(pool, str(path))
+    assert path.read_text() == "keep me"
+
+    # A stale socket is replaced
+    socket_path = str(tmp_path / "onto2robot.sock")
+    make_unix_server(pool, socket_path).server_close()
+    make_unix_server(pool, socket_path).server_close()
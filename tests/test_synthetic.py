@@ -0,0 +1,31 @@
+import pytest
+
+from onto2robot.core import MobileOntologyMeta, load_ontology
+from onto2robot.rules import RuleBase
+from onto2robot.synthetic import synthetic_rules, write_synthetic_ontology
+
+
+def test_synthetic_ontology_round_trip(tmp_path):
+    path = tmp_path / "synthetic.owl"
+    summary = write_synthetic_ontology(path, variables=13, terms=3, rules=120, depth=3, fan_in=2)
+    assert summary["rules"] == 120
+
+    ont = MobileOntologyMeta(load_ontology(str(path)))
+    records = sorted(ont.get_rule_records(), key=lambda rule: int(rule.name.removeprefix("rule")))
+    assert records == list(synthetic_rules(variables=13, terms=3, rules=120, depth=3, fan_in=2))
+    assert all(len(rule.premises) == 2 for rule in records)
+
+    layers, sources = ont.get_possible_chains([ont.get_individual_by_name("goal")])
+    assert [len(layer) for layer in layers] == [1, 4, 4]
+    assert len(sources) == 4
+
+
+def test_synthetic_rules_layers():
+    rules = list(synthetic_rules(variables=7, terms=5, rules=40, depth=2, fan_in=3))
+    layers, sources = RuleBase(rules).get_possible_chains(["goal"])
+    assert [len(layer) for layer in layers] == [1, 3]
+    assert sources == {"v0_0", "v0_1", "v0_2"}
+    assert {term for rule in rules for _, term in rule.premises} == {f"t{i}" for i in range(5)}
+
+    with pytest.raises(ValueError):
+        synthetic_rules(variables=7, terms=3, rules=40, depth=2, fan_in=4)
@@ -0,0 +1,89 @@
+import io
+
+import pytest
+
+from onto2robot.backends import build_engine
+from onto2robot.cli import LINGUISTIC_SPACES
+from onto2robot.core import MobileOntologyMeta
+from onto2robot.inference import run_layers
+from onto2robot.rules import RuleBase
+from onto2robot.synthetic import linguistic_spaces, synthetic_rules
+from onto2robot.tracing import NULL_TRACER, PrintTracer, ProfilingTracer, RecordingTracer
+
+INPUTS = {"sFL": 10, "sFR": 25, "sRF": 5}
+
+
+def _engine(fuzzy_model: str, tracer=None):
+    rule_base = MobileOntologyMeta("tests").rule_base
+    spaces = rule_base.linguistic_value_spaces(LINGUISTIC_SPACES)
+    reasoning_order, _ = rule_base.get_possible_chains(["sFassessment"])
+    return build_engine(fuzzy_model, spaces, "sFassessment", rule_base.rules, tracer=tracer), reasoning_order
+
+
+@pytest.mark.parametrize("fuzzy_model", ["scikit-fuzzy", "simpful", "numpy"])
+def test_recording_tracer(fuzzy_model, capsys):
+    tracer = RecordingTracer()
+    fs, reasoning_order = _engine(fuzzy_model, tracer)
+    capsys.readouterr()
+    outputs = run_layers(fs, INPUTS, reasoning_order)
+
+    # Inference reports to the tracer only
+    assert "Inferred" not in capsys.readouterr().out
+    timings = tracer.timings()
+    assert timings["stage"]["construct"]["count"] == 1
+    assert timings["layer"]["sFassessment"]["count"] == 1
+    assert tracer.values == outputs
+    strengths = tracer.firing["sFassessment"]
+    assert sorted(strengths) == [f"R0{i}" for i in range(1, 10)]
+    assert max(strengths.values()) > 0
+
+
+@pytest.mark.parametrize("fuzzy_model", ["scikit-fuzzy", "simpful", "numpy"])
+def test_recording_tracer_multiple_layers(fuzzy_model):
+    rules = list(synthetic_rules(variables=10, terms=3, rules=45, depth=3))
+    rule_base = RuleBase(rules)
+    reasoning_order, source_variables = rule_base.get_possible_chains(["goal"])
+    assert len(reasoning_order) == 3
+    tracer = RecordingTracer()
+    fs = build_engine(fuzzy_model, rule_base.linguistic_value_spaces(linguistic_spaces(3)), "goal", rules, tracer)
+    outputs = run_layers(fs, dict.fromkeys(source_variables, 12.0), reasoning_order)
+
+    assert tracer.values == outputs
+    assert sorted(tracer.firing) == sorted(outputs)
+    for var_name, strengths in tracer.firing.items():
+        assert sorted(strengths) == sorted(rule.name for rule in rules if rule.conclusion_variable == var_name)
+
+
+def test_tracing_disabled_by_default():
+    fs, reasoning_order = _engine("numpy")
+    assert fs.tracer is NULL_TRACER
+    assert run_layers(fs, INPUTS, reasoning_order)["sFassessment"] > 0
+
+
+def test_profiling_tracer_samples_layers():
+    tracer = ProfilingTracer(sample_every=2)
+    fs, reasoning_order = _engine("numpy", tracer)
+    for _ in range(4):
+        run_layers(fs, INPUTS, reasoning_order)
+    assert tracer.timings()["layer"]["sFassessment"]["count"] == 4
+    assert "mean_of_maximum" in tracer.stats()
+
+
+def test_recording_tracer_aggregates_spans():
+    tracer = RecordingTracer()
+    for duration in [0.5, 2.0, 1.0]:
+        tracer.record("layer", "goal", duration)
+    tracer.record("stage", "construct", 3.0)
+    assert tracer.timings() == {
+        "layer": {"goal": {"count": 3, "total": 3.5, "mean": 3.5 / 3, "max": 2.0}},
+        "stage": {"construct": {"count": 1, "total": 3.0, "mean": 3.0, "max": 3.0}},
+    }
+
+
+def test_print_tracer_reports_values():
+    out = io.StringIO()
+    fs, reasoning_order = _engine("numpy", PrintTracer(out))
+    outputs = run_layers(fs, INPUTS, reasoning_order)
+    printed = out.getvalue()
+    assert "layer sFassessment:" in printed
+    assert f"inferred sFassessment = {outputs['sFassessment']}" in printed
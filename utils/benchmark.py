@@ -0,0 +1,167 @@
+"""Time every stage of the ontology to inference pipeline, per backend, over synthetic rule bases of growing size.
+
+The rule bases come from ``onto2robot.synthetic``: ``depth`` layers of inferred variables above the sources, the last
+one being the single goal, with two premises per rule. Results are written as JSON, and ``--compare`` checks them
+against an earlier run, failing when a stage got slower than ``--tolerance`` times:
+
+    python utils/benchmark.py --rules 30 300 --depth 1 3 --output baseline.json
+    python utils/benchmark.py --rules 30 300 --depth 1 3 --compare baseline.json
+"""
+
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import product
+from pathlib import Path
+from statistics import median
+
+import numpy as np
+
+from onto2robot.backends import BUILTIN_BACKENDS, UNIVERSE_MAX, UNIVERSE_MIN, build_engine
+from onto2robot.core import MobileOntologyMeta, load_ontology
+from onto2robot.synthetic import GOAL, linguistic_spaces, write_synthetic_ontology
+
+TERMS = 3
+FAN_IN = 2
+# skfuzzy checks every rule already in a control system when adding one, construction grows with the square of the
+# rules per layer
+MAX_RULES = {"scikit-fuzzy": 100}
+
+
+def rule_base_variables(rules: int, depth: int, terms: int, fan_in: int) -> int:
+    """Enough variables for about one rule per combination of premise terms on each inferred variable."""
+    width = max(fan_in, round(rules / terms**fan_in / max(depth - 1, 1)))
+    return depth * width + 1
+
+
+def _timed(stages: dict, stage: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    stages.setdefault(stage, []).append(time.perf_counter() - start)
+    return result
+
+
+def run_pipeline(
+    path: Path, backends: list[str], stages: dict, layer_repeat: int, seed: int, activation: dict | None = None
+) -> None:
+    ontology = _timed(stages, "load_ontology", load_ontology, str(path))
+    meta = MobileOntologyMeta(ontology)
+    _timed(stages, "get_rules", meta.get_rules)
+    rule_base = _timed(stages, "extract_rules", lambda: meta.rule_base)
+    _timed(stages, "linguistic_values", meta.linguistic_values)
+    spaces = _timed(stages, "linguistic_value_spaces", meta.linguistic_value_spaces, linguistic_spaces(TERMS))
+    _timed(stages, "get_possible_chains", meta.get_possible_chains, [meta.get_individual_by_name(GOAL)])
+
+    reasoning_order, source_variables = rule_base.get_possible_chains([GOAL])
+    rng = np.random.default_rng(seed)
+    input_values = {var_name: float(rng.uniform(UNIVERSE_MIN, UNIVERSE_MAX)) for var_name in sorted(source_variables)}
+    for backend in backends:
+        fs = _timed(stages, f"{backend}/construct", build_engine, backend, spaces, GOAL, rule_base.rules)
+        for _ in range(layer_repeat):
+            fs.set_start_values(input_values)
+            for depth, layer in enumerate(reversed(reasoning_order), start=1):
+                _timed(stages, f"{backend}/compute_layer_{depth}", fs.compute, layer)
+        if activation is not None and hasattr(fs, "activation_stats"):
+            activation[backend] = fs.activation_stats()
+
+
+def benchmark(
+    rules: int, depth: int, backends: list[str], repeat: int, layer_repeat: int, max_rules: dict, seed: int = 0
+) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / f"synthetic_{rules}_{depth}.owl"
+        variables = rule_base_variables(rules, depth, TERMS, FAN_IN)
+        write_synthetic_ontology(path, variables, TERMS, rules, depth, FAN_IN, seed)
+        ontology_bytes = path.stat().st_size
+        skipped = [backend for backend in backends if rules > max_rules.get(backend, rules)]
+        stages = {}
+        activation = {}
+        for _ in range(repeat):
+            run_pipeline(
+                path,
+                [backend for backend in backends if backend not in skipped],
+                stages,
+                layer_repeat,
+                seed,
+                activation,
+            )
+    return {
+        "rules": rules,
+        "depth": depth,
+        "variables": variables,
+        "ontology_bytes": ontology_bytes,
+        "skipped_backends": skipped,
+        "stages": {stage: median(samples) for stage, samples in stages.items()},
+        # Rules evaluated and fired per inference, for the backends reporting them
+        "rule_activation": activation,
+    }
+
+
+def git_commit() -> str | None:
+    with contextlib.suppress(OSError, subprocess.CalledProcessError):
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], check=True, capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_seconds: float = 1e-3) -> list[str]:
+    """Stages slower than ``tolerance`` times the baseline, ignoring those too fast to time reliably."""
+    baseline_runs = {(run["rules"], run["depth"]): run["stages"] for run in baseline["runs"]}
+    regressions = []
+    for run in results["runs"]:
+        for stage, seconds in run["stages"].items():
+            before = baseline_runs.get((run["rules"], run["depth"]), {}).get(stage)
+            if before is not None and seconds > min_seconds and seconds > tolerance * before:
+                regressions.append(
+                    f"{stage} with {run['rules']} rules, depth {run['depth']}: {before:.4f} s -> {seconds:.4f} s"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[30, 300, 3000])
+    parser.add_argument("--depth", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--backends", nargs="+", default=list(BUILTIN_BACKENDS), choices=list(BUILTIN_BACKENDS))
+    parser.add_argument("--repeat", type=int, default=3, help="Pipeline runs per rule base, the median is reported")
+    parser.add_argument("--layer_repeat", type=int, default=3, help="Inferences per pipeline run")
+    parser.add_argument(
+        "--no_rule_limits", action="store_true", help="Run every backend at every size, even the slowest ones"
+    )
+    parser.add_argument("--output", type=str, default=None, help="JSON file to write, instead of stdout")
+    parser.add_argument("--compare", type=str, default=None, help="JSON file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Slowdown factor counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "backends": args.backends,
+        "runs": [
+            benchmark(
+                rules, depth, args.backends, args.repeat, args.layer_repeat, {} if args.no_rule_limits else MAX_RULES
+            )
+            for rules, depth in product(args.rules, args.depth)
+        ],
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""Compare the closed-form defuzzification of ``onto2robot.analytic`` with the grid-based ones, in time and error.
+
+Random cut levels are applied to ``automf`` partitions, then defuzzified exactly and on universes of growing resolution,
+by the NumPy backend (mean of maximum) and by skfuzzy (mean of maximum and centroid, one sample at a time). Errors are
+measured against the exact values:
+
+    python utils/defuzzification_report.py --terms 3 5 --resolution 40 401 4001
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import skfuzzy as fuzz
+
+from onto2robot import analytic
+from onto2robot.backends import UNIVERSE_MAX, UNIVERSE_MIN
+from onto2robot.membership import automf_points, triangular_membership
+from onto2robot.numpy_wrapper import mean_of_maximum
+
+
+def random_cuts(samples: int, terms: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    cuts = rng.uniform(0, 1, (samples, terms))
+    # Like rule bases, where most terms do not fire at once
+    cuts[rng.uniform(size=cuts.shape) < 0.5] = 0
+    return cuts
+
+
+def _timed(func, *args) -> tuple[float, np.ndarray]:
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, np.asarray(result)
+
+
+def _skfuzzy(universe: np.ndarray, memberships: np.ndarray, cuts: np.ndarray, mode: str) -> list[float]:
+    outputs = []
+    for row in cuts:
+        aggregated = np.fmin(row[:, np.newaxis], memberships).max(axis=0)
+        outputs.append(fuzz.defuzz(universe, aggregated, mode) if aggregated.any() else universe.mean())
+    return outputs
+
+
+def report(terms_list: list[int], resolutions: list[int], samples: int, skfuzzy_samples: int, seed: int) -> list[dict]:
+    bounds = np.array([UNIVERSE_MIN, UNIVERSE_MAX])
+    results = []
+    for terms in terms_list:
+        points = np.array(automf_points(terms, bounds))
+        cuts = random_cuts(samples, terms, seed)
+        exact = {}
+        for mode, method in [("mom", analytic.mean_of_maximum), ("centroid", analytic.centroid)]:
+            seconds, exact[mode] = _timed(method, points, cuts, UNIVERSE_MIN, UNIVERSE_MAX)
+            results.append(
+                {
+                    "terms": terms,
+                    "path": f"analytic/{mode}",
+                    "resolution": None,
+                    "us": seconds / samples * 1e6,
+                    "max_error": 0.0,
+                }
+            )
+
+        for resolution in resolutions:
+            universe = np.linspace(UNIVERSE_MIN, UNIVERSE_MAX, resolution)
+            memberships = np.array([triangular_membership(universe, *abc) for abc in points])
+            seconds, grid = _timed(mean_of_maximum, universe, memberships, cuts)
+            results.append(
+                {
+                    "terms": terms,
+                    "path": "numpy/mom",
+                    "resolution": resolution,
+                    "us": seconds / samples * 1e6,
+                    "max_error": float(np.abs(grid - exact["mom"]).max()),
+                }
+            )
+            for mode in ["mom", "centroid"]:
+                seconds, grid = _timed(_skfuzzy, universe, memberships, cuts[:skfuzzy_samples], mode)
+                results.append(
+                    {
+                        "terms": terms,
+                        "path": f"skfuzzy/{mode}",
+                        "resolution": resolution,
+                        "us": seconds / skfuzzy_samples * 1e6,
+                        "max_error": float(np.abs(grid - exact[mode][:skfuzzy_samples]).max()),
+                    }
+                )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, nargs="+", default=[3, 5, 7])
+    parser.add_argument("--resolution", type=int, nargs="+", default=[40, 401, 4001])
+    parser.add_argument("--samples", type=int, default=2000, help="Random cut levels per term count")
+    parser.add_argument("--skfuzzy_samples", type=int, default=200, help="Of those, defuzzified by skfuzzy")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = report(args.terms, args.resolution, args.samples, min(args.skfuzzy_samples, args.samples), args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'terms':>5}  {'path':<18}{'resolution':>10}{'per sample [us]':>17}{'max error':>11}")
+    for row in results:
+        resolution = "exact" if row["resolution"] is None else row["resolution"]
+        print(f"{row['terms']:>5}  {row['path']:<18}{resolution:>10}{row['us']:>17.2f}{row['max_error']:>11.3g}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""Report the import time of the CLI and of each backend, from ``python -X importtime`` in fresh interpreters.
+
+With ``--max_cli_ms`` it doubles as a regression check, failing when importing the CLI gets slower than that:
+
+    python utils/import_time_report.py --max_cli_ms 150
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from statistics import median
+
+TARGETS = {
+    "cli": "onto2robot.cli",
+    "backend scikit-fuzzy": "onto2robot.scikit_fuzz_wrapper",
+    "backend simpful": "onto2robot.fs_wrapper",
+    "backend numpy": "onto2robot.numpy_wrapper",
+    "ontology loading": "onto2robot.core",
+}
+
+
+def measure(module: str) -> dict:
+    src = Path(__file__).resolve().parents[1] / "src"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(src), os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    # Lines look like "import time: self [us] | cumulative | package", nested imports are indented by two spaces
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), int(cumulative_us), depth))
+    # Interpreter start-up (site, encodings) is not counted, only the target and what it imports
+    (total_us,) = [cumulative_us for name, cumulative_us, depth in imports if name == module and depth == 0]
+    direct = sorted(((cumulative_us, name) for name, cumulative_us, depth in imports if depth == 1), reverse=True)
+    return {
+        "total_ms": total_us / 1000,
+        "heaviest_imports": {name: cumulative_us / 1000 for cumulative_us, name in direct[:4]},
+    }
+
+
+def report(repeat: int = 3) -> dict:
+    results = {}
+    for label, module in TARGETS.items():
+        samples = [measure(module) for _ in range(repeat)]
+        results[label] = {**samples[-1], "total_ms": median(sample["total_ms"] for sample in samples)}
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max_cli_ms", type=float, default=None, help="Fail when importing the CLI takes longer")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = report(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'target':<24}{'import [ms]':>12}  heaviest direct imports [ms]")
+        for label, row in results.items():
+            heaviest = ", ".join(f"{name} {ms:.0f}" for name, ms in row["heaviest_imports"].items())
+            print(f"{label:<24}{row['total_ms']:>12.1f}  {heaviest}")
+    if args.max_cli_ms is not None and results["cli"]["total_ms"] > args.max_cli_ms:
+        print(f"Importing the CLI took {results['cli']['total_ms']:.1f} ms, over {args.max_cli_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
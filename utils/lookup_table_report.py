@@ -0,0 +1,84 @@
+"""Compile a goal's layered inference into lookup tables and report their memory and interpolation error.
+
+The table is sampled from one backend and checked against a reference backend on random inputs:
+
+    python utils/lookup_table_report.py ontologies/mobile_robot_ontology.owl sFassessment --resolution 11 21 41
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from onto2robot.backends import BUILTIN_BACKENDS, UNIVERSE_MAX, UNIVERSE_MIN, build_engine
+from onto2robot.cache import compile_rule_base
+from onto2robot.cli import LINGUISTIC_SPACES
+from onto2robot.lookup_table import compile_lookup_table, interpolation_error
+
+BACKENDS = list(BUILTIN_BACKENDS)
+
+
+def report(ontology: str, goal: str, resolutions: list[int], backend: str, reference: str, samples: int) -> list[dict]:
+    rule_base = compile_rule_base(ontology, [goal])
+    reasoning_order, source_variables = rule_base.get_possible_chains([goal])
+    spaces = rule_base.linguistic_value_spaces(LINGUISTIC_SPACES)
+    engine = build_engine(backend, spaces, goal, rule_base.rules)
+    reference_engine = build_engine(reference, spaces, goal, rule_base.rules)
+
+    results = []
+    for resolution in resolutions:
+        start = time.perf_counter()
+        table = compile_lookup_table(
+            engine, source_variables, reasoning_order, resolution, (UNIVERSE_MIN, UNIVERSE_MAX)
+        )
+        compiled = time.perf_counter()
+        errors = interpolation_error(table, reference_engine, reasoning_order, samples)
+
+        inputs = {var_name: np.full(1, (UNIVERSE_MIN + UNIVERSE_MAX) / 2) for var_name in table.source_variables}
+        repeat = 1000
+        lookup_start = time.perf_counter()
+        for _ in range(repeat):
+            table.compute_batch(inputs)
+        lookup_s = (time.perf_counter() - lookup_start) / repeat
+        results.append(
+            {
+                "resolution": resolution,
+                "source_variables": table.source_variables,
+                "cells": int(resolution ** len(table.source_variables)),
+                "nbytes": table.nbytes,
+                "compile_s": compiled - start,
+                "lookup_s": lookup_s,
+                "max_error": errors,
+            }
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ontology")
+    parser.add_argument("goal")
+    parser.add_argument("--resolution", type=int, nargs="+", default=[11, 21, 41])
+    parser.add_argument("--backend", choices=BACKENDS, default="numpy", help="Backend the table is sampled from")
+    parser.add_argument("--reference", choices=BACKENDS, default="scikit-fuzzy", help="Backend to measure against")
+    parser.add_argument("--samples", type=int, default=1000, help="Random inputs for the error estimate")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = report(args.ontology, args.goal, args.resolution, args.backend, args.reference, args.samples)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'resolution':>10}{'cells':>12}{'memory [KiB]':>14}{'compile [s]':>13}{'lookup [us]':>13}  max error")
+    for row in results:
+        errors = ", ".join(f"{var_name}={error:.3g}" for var_name, error in row["max_error"].items())
+        print(
+            f"{row['resolution']:>10}{row['cells']:>12}{row['nbytes'] / 1024:>14.1f}"
+            f"{row['compile_s']:>13.2f}{row['lookup_s'] * 1e6:>13.1f}  {errors}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
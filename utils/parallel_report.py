@@ -0,0 +1,65 @@
+"""Measure how SimpfulFuzzyWrapper.compute_batch scales with the number of worker processes.
+
+The timing includes starting the pool, where every worker builds its simpful system from the wrapper's spec:
+
+    python utils/parallel_report.py ontologies/mobile_robot_ontology.owl sFassessment --max_workers 8
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from onto2robot.backends import UNIVERSE_MAX, UNIVERSE_MIN
+from onto2robot.cache import compile_rule_base
+from onto2robot.cli import LINGUISTIC_SPACES
+from onto2robot.fs_wrapper import SimpfulFuzzyWrapper
+
+
+def report(ontology: str, goal: str, samples: int, workers: list[int], seed: int = 0) -> list[dict]:
+    rule_base = compile_rule_base(ontology, [goal])
+    spaces = rule_base.linguistic_value_spaces(LINGUISTIC_SPACES)
+    fs = SimpfulFuzzyWrapper(spaces, (UNIVERSE_MIN, UNIVERSE_MAX), rule_base.rules, goals=[goal])
+    rng = np.random.default_rng(seed)
+    inputs = {var_name: rng.uniform(UNIVERSE_MIN, UNIVERSE_MAX, samples) for var_name in sorted(fs.source_variables)}
+
+    results = []
+    for worker_no in workers:
+        start = time.perf_counter()
+        fs.compute_batch(inputs, workers=worker_no)
+        elapsed = time.perf_counter() - start
+        results.append(
+            {
+                "workers": worker_no,
+                "samples": samples,
+                "elapsed_s": elapsed,
+                "samples_per_s": samples / elapsed,
+                "speedup": results[0]["elapsed_s"] / elapsed if results else 1.0,
+            }
+        )
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ontology")
+    parser.add_argument("goal")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--max_workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = report(args.ontology, args.goal, args.samples, list(range(1, args.max_workers + 1)))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'workers':>8}{'time [s]':>10}{'samples/s':>11}{'speedup':>9}")
+    for row in results:
+        print(f"{row['workers']:>8}{row['elapsed_s']:>10.2f}{row['samples_per_s']:>11.1f}{row['speedup']:>8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
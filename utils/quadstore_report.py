@@ -0,0 +1,91 @@
+"""Compare load time and peak resident memory of the in-memory and SQLite quadstore ontology loaders.
+
+Each measurement runs in a fresh interpreter so imports and owlready2 caches do not leak between modes:
+
+    python utils/quadstore_report.py mobile_robot_ontology --repeat 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from statistics import median
+
+CHILD = """
+import json, resource, sys, time
+import onto2robot.core  # imported before timing, only the load itself is measured
+from onto2robot.core import MobileOntologyMeta
+
+name, quadstore = sys.argv[1], sys.argv[2] or None
+rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+ont = MobileOntologyMeta(name, quadstore=quadstore)
+loaded = time.perf_counter()
+rules = ont.get_rule_records()
+done = time.perf_counter()
+rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+ont.destroy()
+print(json.dumps({
+    "load_s": loaded - start,
+    "load_and_extract_s": done - start,
+    "rules": len(rules),
+    "peak_rss_kib": rss_after,
+    "rss_growth_kib": rss_after - rss_before,
+}))
+"""
+
+
+def run_child(ontology: str, quadstore: str | None) -> dict:
+    src = Path(__file__).resolve().parents[1] / "src"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(src), os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, ontology, quadstore or ""],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: list[dict]) -> dict:
+    return {key: median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def report(ontology: str, repeat: int = 3) -> dict:
+    results = {"memory": summarize([run_child(ontology, None) for _ in range(repeat)])}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        quadstore = str(Path(tmp_dir) / "quadstore.sqlite3")
+        # The first run parses the XML into the quadstore, the following ones reuse it
+        results["quadstore_cold"] = run_child(ontology, quadstore)
+        results["quadstore_warm"] = summarize([run_child(ontology, quadstore) for _ in range(repeat)])
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ontology", nargs="?", default="mobile_robot_ontology")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = report(args.ontology, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    baseline = results["memory"]
+    print(f"{'mode':<16}{'load [ms]':>12}{'load+extract [ms]':>20}{'peak RSS [MiB]':>16}{'vs memory':>12}")
+    for mode, values in results.items():
+        ratio = values["load_and_extract_s"] / baseline["load_and_extract_s"]
+        print(
+            f"{mode:<16}{values['load_s'] * 1000:>12.1f}{values['load_and_extract_s'] * 1000:>20.1f}"
+            f"{values['peak_rss_kib'] / 1024:>16.1f}{ratio:>11.2f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+"""Time the NumPy backend with and without the sparse rule activation index, on combinatorial rule bases.
+
+Each rule base has one goal concluded from every combination of ``terms`` over ``fan_in`` source variables, so only
+the few rules whose premise terms all overlap the inputs can fire:
+
+    python utils/rule_activation_report.py --terms 3 5 7 --fan_in 4 5
+"""
+
+import argparse
+import json
+import time
+from itertools import product
+
+import numpy as np
+
+from onto2robot.backends import UNIVERSE_MAX, UNIVERSE_MIN
+from onto2robot.inference import run_layers
+from onto2robot.numpy_wrapper import NumpyFuzzyWrapper
+from onto2robot.rules import RuleRecord
+from onto2robot.synthetic import GOAL, term_names
+
+
+def combinatorial_rules(terms: list[str], fan_in: int) -> list[RuleRecord]:
+    sources = [f"s{i}" for i in range(fan_in)]
+    return [
+        RuleRecord(
+            f"rule{n}",
+            tuple(zip(sources, combination, strict=True)),
+            (GOAL, terms[sum(map(terms.index, combination)) % len(terms)]),
+        )
+        for n, combination in enumerate(product(terms, repeat=fan_in))
+    ]
+
+
+def report(terms_list: list[int], fan_ins: list[int], ticks: int, seed: int) -> list[dict]:
+    universe = np.arange(UNIVERSE_MIN, UNIVERSE_MAX, 1)
+    results = []
+    for terms_no, fan_in in product(terms_list, fan_ins):
+        terms = term_names(terms_no)
+        rules = combinatorial_rules(terms, fan_in)
+        spaces = {variable: terms for variable in [*(f"s{i}" for i in range(fan_in)), GOAL]}
+        rng = np.random.default_rng(seed)
+        inputs = [{f"s{i}": float(value) for i, value in enumerate(rng.uniform(0, 39, fan_in))} for _ in range(ticks)]
+        row = {"terms": terms_no, "fan_in": fan_in, "rules": len(rules)}
+        for sparse in [False, True]:
+            fs = NumpyFuzzyWrapper(spaces, universe, rules, goals=[GOAL], sparse=sparse)
+            start = time.perf_counter()
+            outputs = [run_layers(fs, input_values, fs.reasoning_order) for input_values in inputs]
+            row["sparse_us" if sparse else "dense_us"] = (time.perf_counter() - start) / ticks * 1e6
+            row["sparse_outputs" if sparse else "dense_outputs"] = outputs
+        stats = fs.activation_stats()
+        if row.pop("sparse_outputs") != row.pop("dense_outputs"):
+            raise AssertionError(f"Sparse and dense inference disagree on {len(rules)} rules")
+        row.update(evaluated_per_tick=stats["evaluated_per_tick"], fired_per_tick=stats["fired_per_tick"])
+        results.append(row)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, nargs="+", default=[3, 5, 7])
+    parser.add_argument("--fan_in", type=int, nargs="+", default=[2, 4, 5])
+    parser.add_argument("--ticks", type=int, default=200, help="Random inputs inferred per rule base")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = report(args.terms, args.fan_in, args.ticks, args.seed)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    header = f"{'terms':>5}{'fan in':>7}{'rules':>8}{'evaluated/tick':>16}"
+    print(f"{header}{'dense [us]':>12}{'sparse [us]':>13}{'speedup':>9}")
+    for row in results:
+        print(
+            f"{row['terms']:>5}{row['fan_in']:>7}{row['rules']:>8}{row['evaluated_per_tick']:>16.1f}"
+            f"{row['dense_us']:>12.1f}{row['sparse_us']:>13.1f}{row['dense_us'] / row['sparse_us']:>9.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())